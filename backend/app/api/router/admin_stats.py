@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.core.security import is_admin_user,get_current_active_user
+from app.core.security import is_admin_user,get_current_active_user, is_admin
 from app.db.models import User
 from app.api.schemas.stats import AdminDashboardStats
 from app.api.service.stats import get_admin_dashboard_stats
+from app.core.tasks import sweep_history
 
 router = APIRouter()
 
@@ -15,4 +16,11 @@ def get_admin_stats(
 ):
    
     is_admin_user(current_user)
-    return get_admin_dashboard_stats(db, current_user)
\ No newline at end of file
+    return get_admin_dashboard_stats(db, current_user)
+
+@router.get("/overdue-sweeps", response_model=list[dict])
+def get_overdue_sweeps(
+    current_user: User = Depends(is_admin)
+):
+    """Recent overdue sweeps with the number of rows each one touched"""
+    return list(reversed(sweep_history))
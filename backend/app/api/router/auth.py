@@ -1,8 +1,9 @@
 from app.db import models
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.core.security import create_access_token
+from app.core.security import create_access_token, hash_password_async
 from app.db.session import get_db
 from app.api.schemas.auth import (
     UserCreate,
@@ -19,39 +20,41 @@ from app.api.schemas.auth import (
     ResetPasswordResponse
 )
 from app.api.service.auth import (
+    get_user_by_email,
     create_user,
     create_user_admin,
     verify_otp,
-    authenticate_user,
+    authenticate_user_async,
     send_otp_email,
+    send_verification_otp,
     resend_otp,
     initiate_password_reset,
-    reset_password
+    reset_password_async
 )
-import random
-from datetime import datetime, timedelta
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login-form")
 
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(get_user_by_email, db, user_data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    user = create_user(db, user_data)
-    send_otp_email(user.email, user.otp)
+    hashed_password = await hash_password_async(user_data.password)
+    user = await run_in_threadpool(create_user, db, user_data, hashed_password)
+    await run_in_threadpool(send_otp_email, db, user.email, user.otp)
     return user
 @router.post("/register-admin", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(get_user_by_email, db, user_data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    user = create_user_admin(db, user_data)
-    send_otp_email(user.email, user.otp)
+    hashed_password = await hash_password_async(user_data.password)
+    user = await run_in_threadpool(create_user_admin, db, user_data, hashed_password)
+    await run_in_threadpool(send_otp_email, db, user.email, user.otp)
     return user
 
 @router.post("/verify-otp", response_model=UserResponse)
@@ -62,8 +65,8 @@ def verify_otp_endpoint(otp_data: OTPVerify, db: Session = Depends(get_db)):
     return user
 
 @router.post("/login-form", response_model=Token)
-def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,8 +82,8 @@ def login_form(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
     }
 
 @router.post("/login", response_model=Token)
-def login_body(login_data: LoginBody, db: Session = Depends(get_db)):
-    user = authenticate_user(db, login_data.email, login_data.password)
+async def login_body(login_data: LoginBody, db: Session = Depends(get_db)):
+    user = await authenticate_user_async(db, login_data.email, login_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -91,15 +94,7 @@ def login_body(login_data: LoginBody, db: Session = Depends(get_db)):
     # Check if user is verified
     if not user.is_verified:
         # Generate new OTP and send it
-        otp = str(random.randint(100000, 999999))
-        otp_expiry = datetime.utcnow() + timedelta(minutes=5)
-        
-        user.otp = otp
-        user.otp_expiry = otp_expiry
-        db.commit()
-        
-        # Send OTP email
-        send_otp_email(user.email, otp)
+        await run_in_threadpool(send_verification_otp, db, user)
         
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -136,10 +131,10 @@ def forgot_password(
     return initiate_password_reset(db, request.email)
 
 @router.post("/reset-password", response_model=ResetPasswordResponse)
-def reset_password_endpoint(
+async def reset_password_endpoint(
     request: ResetPasswordRequest,
     db: Session = Depends(get_db)
 ):
     
-    return reset_password(db, request.email, request.otp, request.new_password)
+    return await reset_password_async(db, request.email, request.otp, request.new_password)
 
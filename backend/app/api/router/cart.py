@@ -1,37 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db, get_async_db
 from app.core.security import get_current_active_user
 from app.db import models
 from app.api.schemas.cart import (
     CartItemCreate,
     CartItemUpdate,
     CartItemResponse,
-    CartResponse
+    CartResponse,
+    CartCheckout,
+    CheckoutResponse
 )
 from app.api.service.cart import (
-    get_cart_items,
+    get_cart_async,
     add_to_cart,
     update_cart_item,
     remove_from_cart,
     clear_cart,
-    get_cart_total
+    checkout_cart
 )
 
 router = APIRouter()
 
 @router.get("/", response_model=CartResponse)
-def read_cart(
-    db: Session = Depends(get_db),
+async def read_cart(
+    db: AsyncSession = Depends(get_async_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    
-    items = get_cart_items(db, current_user.id)
-    return {
-        "items": items,
-        "total_items": sum(item.quantity for item in items),
-        "total_amount": get_cart_total(db, current_user.id)
-    }
+
+    return await get_cart_async(db, current_user.id)
 
 @router.post("/items", response_model=CartItemResponse)
 def add_cart_item(
@@ -69,4 +67,13 @@ def clear_user_cart(
 ):
 
     clear_cart(db, current_user.id)
-    return {"message": "Cart cleared"}
\ No newline at end of file
+    return {"message": "Cart cleared"}
+
+@router.post("/checkout", response_model=CheckoutResponse, status_code=status.HTTP_201_CREATED)
+def checkout(
+    checkout_data: CartCheckout,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Purchase everything in the cart in a single transaction"""
+    return checkout_cart(db, current_user.id, checkout_data)
@@ -1,8 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db, get_async_db
 from app.api.schemas.installments import InstallmentResponse
-from app.api.service.installments import pay_installment, get_user_installments, get_user_installment_stats
+from app.api.service.installments import (
+    pay_installment,
+    get_user_installments_async,
+    get_user_installment_stats,
+    installments_export_select
+)
+from app.core.export import ExportFormat, export_response
 from app.core.security import get_current_active_user, is_admin
 from app.db.models import User, PaymentStatusEnum
 from typing import Optional
@@ -10,10 +17,11 @@ from pydantic import BaseModel
 
 class InstallmentListResponse(BaseModel):
     items: list[InstallmentResponse]
-    total: int
+    total: Optional[int]
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
 
 router = APIRouter()
 
@@ -26,8 +34,8 @@ def pay_existing_installment(
     return pay_installment(db, installment_id, current_user.id)
 
 @router.get("/me", response_model=InstallmentListResponse)
-def read_user_installments(
-    db: Session = Depends(get_db),
+async def read_user_installments(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     page: int = Query(1, gt=0),
     page_size: int = Query(10, gt=0, le=100),
@@ -35,8 +43,10 @@ def read_user_installments(
     is_paid: Optional[bool] = None,
     sort_by: str = "due_date",
     sort_order: str = "desc",
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = True,
 ):
-    return get_user_installments(
+    return await get_user_installments_async(
         db=db,
         user_id=current_user.id,
         page=page,
@@ -44,12 +54,14 @@ def read_user_installments(
         status=status,
         is_paid=is_paid,
         sort_by=sort_by,
-        sort_order=sort_order
+        sort_order=sort_order,
+        after=after,
+        include_total=include_total
     )
 
 @router.get("/admin", response_model=InstallmentListResponse)
-def read_admin_installments(
-    db: Session = Depends(get_db),
+async def read_admin_installments(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(is_admin),
     page: int = Query(1, gt=0),
     page_size: int = Query(10, gt=0, le=100),
@@ -58,8 +70,10 @@ def read_admin_installments(
     user_id: Optional[int] = None,
     sort_by: str = "due_date",
     sort_order: str = "desc",
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = True,
 ):
-    return get_user_installments(
+    return await get_user_installments_async(
         db=db,
         user_id=user_id,
         page=page,
@@ -68,8 +82,30 @@ def read_admin_installments(
         is_paid=is_paid,
         sort_by=sort_by,
         sort_order=sort_order,
-        is_admin=True
+        is_admin=True,
+        after=after,
+        include_total=include_total
+    )
+
+@router.get("/admin/export")
+def export_admin_installments(
+    current_user: User = Depends(is_admin),
+    export_format: ExportFormat = Query("csv", alias="format"),
+    status: Optional[str] = Query(None, enum=[s.value for s in PaymentStatusEnum]),
+    is_paid: Optional[bool] = None,
+    user_id: Optional[int] = None,
+    sort_by: str = "due_date",
+    sort_order: str = "desc",
+):
+    """Stream every installment matching the admin listing filters as CSV or NDJSON"""
+    stmt = installments_export_select(
+        user_id=user_id,
+        status=status,
+        is_paid=is_paid,
+        sort_by=sort_by,
+        sort_order=sort_order
     )
+    return export_response(stmt, export_format, "installments")
 
 @router.get("/stats", response_model=dict)
 def get_installment_stats(
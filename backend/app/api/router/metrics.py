@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.core.security import is_admin
+from app.core.metrics import registry
+from app.core.query_log import query_log_config, query_reports
+from app.api.schemas.metrics import QueryLogSettings, QueryLogUpdate, QueryReport
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics(current_user: bool = Depends(is_admin)):
+    """Request, database and pool metrics in the Prometheus text format"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/metrics/query-log", response_model=QueryLogSettings)
+def read_query_log_settings(current_user: bool = Depends(is_admin)):
+    """Current query log switches of this process"""
+    return query_log_config.as_dict()
+
+@router.patch("/metrics/query-log", response_model=QueryLogSettings)
+def update_query_log_settings(changes: QueryLogUpdate, current_user: bool = Depends(is_admin)):
+    """Turn the query log on or off, or change its sampling and thresholds, without a restart"""
+    return query_log_config.update(**changes.model_dump(exclude_unset=True))
+
+@router.get("/metrics/query-log/reports", response_model=list[QueryReport])
+def read_query_reports(current_user: bool = Depends(is_admin)):
+    """Recent requests with slow or repeated statements, newest first"""
+    return list(reversed(query_reports))
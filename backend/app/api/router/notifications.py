@@ -4,21 +4,26 @@ from app.db.session import get_db
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.api.schemas.notifications import (
     NotificationCreate,
     NotificationResponse,
-    NotificationListResponse
+    NotificationListResponse,
+    BulkNotificationCreate,
+    NotificationJobResponse
 )
 from app.api.service.notifications import (
     get_notifications,
     create_notification,
-    
+    create_notification_job,
+    get_notification_job
 )
+from app.core.tasks import run_notification_job
 from app.core.security import get_current_active_user, oauth2_scheme
 from app.db import models
+from typing import Optional
 
 router = APIRouter()
 
@@ -35,17 +40,45 @@ def list_notifications(
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     order_by: str = Query("created_at"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = True,
     current_user: models.User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     skip = (page - 1) * size
-    notifications, total = get_notifications(db,current_user, skip=skip, limit=size, order_by=order_by)
+    notifications, total, cursor = get_notifications(
+        db,
+        current_user,
+        skip=skip,
+        limit=size,
+        order_by=order_by,
+        after=after,
+        include_total=include_total
+    )
     return {
         "items": notifications,
         "total": total,
         "page": page,
-        "size": size
+        "size": size,
+        "next_cursor": cursor
     }
 
+@router.post("/bulk", response_model=NotificationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_bulk_notification(
+    job_data: BulkNotificationCreate,
+    background_tasks: BackgroundTasks,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Notify every user in an audience; poll the returned job for progress"""
+    job = create_notification_job(db, job_data, current_user)
+    background_tasks.add_task(run_notification_job, job.id)
+    return job
 
-
+@router.get("/jobs/{job_id}", response_model=NotificationJobResponse)
+def read_notification_job(
+    job_id: int,
+    current_user: models.User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    return get_notification_job(db, job_id, current_user)
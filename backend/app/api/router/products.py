@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.orm import Session
 from typing import Optional
-from app.db.session import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db, get_async_db
 from app.api.schemas.products import (
     ProductCreate,
     ProductUpdate,
@@ -10,8 +11,9 @@ from app.api.schemas.products import (
 )
 from app.api.service.products import (
     create_product,
-    get_product,
-    get_products,
+    get_catalog_page,
+    get_catalog_product,
+    get_catalog_search,
     update_product,
     delete_product
 )
@@ -20,26 +22,44 @@ from app.db import models
 
 router = APIRouter()
 
+def _catalog_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/", response_model=ProductListResponse)
-def list_products(
+async def list_products(
+    request: Request,
     page: int = Query(1, ge=1),
     size: int = Query(10, ge=1, le=100),
     category_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    skip = (page - 1) * size
-    products, total = get_products(
-        db, 
-        skip=skip, 
-        limit=size,
-        category_id=category_id
+    body, etag = await get_catalog_page(
+        db,
+        page=page,
+        size=size,
+        category_id=category_id,
+        after=after,
+        include_total=include_total
     )
-    return {
-        "items": products,
-        "total": total,
-        "page": page,
-        "size": size
-    }
+    return _catalog_response(request, body, etag)
+
+@router.get("/search", response_model=ProductListResponse)
+def search_catalog(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    include_total: bool = True,
+    db: Session = Depends(get_db)
+):
+    """Full-text search over product names and descriptions, ranked by relevance"""
+    body, etag = get_catalog_search(db, q, page=page, size=size, include_total=include_total)
+    return _catalog_response(request, body, etag)
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
 def create_new_product(
@@ -57,9 +77,11 @@ def create_new_product(
 @router.get("/{product_id}", response_model=ProductResponse)
 def read_product(
     product_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    return get_product(db, product_id)
+    body, etag = get_catalog_product(db, product_id)
+    return _catalog_response(request, body, etag)
 
 @router.patch("/{product_id}", response_model=ProductResponse)
 def update_existing_product(
@@ -3,9 +3,11 @@ from app.api.service.notifications import send_purchase_notification
 from app.db import models
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.api.schemas.purchases import PurchaseCreate, PurchaseResponse, PurchaseWithInstallmentsResponse
-from app.api.service.purchases import create_purchase, get_purchases_with_installments
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db, get_async_db
+from app.api.schemas.purchases import PurchaseCreate, PurchaseResponse, PurchaseListResponse
+from app.api.service.purchases import create_purchase, get_purchases_with_installments_async, purchases_export_select
+from app.core.export import ExportFormat, export_response
 from app.core.security import get_current_active_user, is_admin
 from app.db.models import User, PaymentStatusEnum
 from typing import Optional
@@ -20,39 +22,58 @@ def create_purchase_endpoint(
 ):
     return create_purchase(db, purchase, current_user.id)
 
-@router.get("/me", response_model=list[PurchaseWithInstallmentsResponse])
-def read_user_purchases(
-    db: Session = Depends(get_db),
+@router.get("/me", response_model=PurchaseListResponse)
+async def read_user_purchases(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     page: int = Query(1, gt=0),
     page_size: int = Query(10, gt=0, le=100),
     status: Optional[str] = Query(None, enum=[s.value for s in PaymentStatusEnum]),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = True,
 ):
-    return get_purchases_with_installments(
+    return await get_purchases_with_installments_async(
         db=db,
         user_id=current_user.id,
         page=page,
         page_size=page_size,
-        status=status
+        status=status,
+        after=after,
+        include_total=include_total
     )
 
-@router.get("/admin", response_model=list[PurchaseWithInstallmentsResponse])
-def read_admin_purchases(
-    db: Session = Depends(get_db),
+@router.get("/admin", response_model=PurchaseListResponse)
+async def read_admin_purchases(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(is_admin),
     page: int = Query(1, gt=0),
     page_size: int = Query(10, gt=0, le=100),
     status: Optional[str] = Query(None, enum=[s.value for s in PaymentStatusEnum]),
     user_id: Optional[int] = None,
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    include_total: bool = True,
 ):
-    return get_purchases_with_installments(
+    return await get_purchases_with_installments_async(
         db=db,
         user_id=user_id,
         page=page,
         page_size=page_size,
-        status=status
+        status=status,
+        after=after,
+        include_total=include_total
     )
 
+@router.get("/admin/export")
+def export_admin_purchases(
+    current_user: User = Depends(is_admin),
+    export_format: ExportFormat = Query("csv", alias="format"),
+    status: Optional[str] = Query(None, enum=[s.value for s in PaymentStatusEnum]),
+    user_id: Optional[int] = None,
+):
+    """Stream every purchase matching the admin listing filters as CSV or NDJSON"""
+    stmt = purchases_export_select(user_id=user_id, status=status)
+    return export_response(stmt, export_format, "purchases")
+
 @router.post("/{purchase_id}/notify", response_model=NotificationResponse)
 def send_purchase_notification_endpoint(
     purchase_id: int,
@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import Optional
 from app.db.session import get_db
 from app.api.schemas.users import UserResponse
-from app.api.service.users import get_current_user, get_customers, delete_user
+from app.api.service.users import get_customers, delete_user
 from app.core.security import get_current_active_user, oauth2_scheme, is_admin
 from app.db.models import User, RoleEnum
 
@@ -11,13 +11,14 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
 def read_current_user(
-    current_user: str = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user)
 ):
-    return get_current_user(db, current_user)
+    # The auth dependency has already loaded the user
+    return current_user
 
 @router.get("/admin/customers", response_model=list[UserResponse])
 def read_customers(
+    response: Response,
     db: Session = Depends(get_db),
     page: int = Query(1, gt=0),
     page_size: int = Query(10, gt=0, le=100),
@@ -25,17 +26,26 @@ def read_customers(
     sort_order: str = "desc",
     name: Optional[str] = None,
     role: Optional[str] = Query(None, enum=[r.value for r in RoleEnum]),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's X-Next-Cursor header"),
+    include_total: bool = True,
     current_user: User = Depends(is_admin)
 ):
-    return get_customers(
+    customers, total, cursor = get_customers(
         db=db,
         page=page,
         page_size=page_size,
         sort_by=sort_by,
         sort_order=sort_order,
         name=name,
-        role=role
+        role=role,
+        after=after,
+        include_total=include_total
     )
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    return customers
 
 @router.delete("/admin/customers/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_customer(
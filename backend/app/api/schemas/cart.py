@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List
 from .products import ProductResponse
+from .purchases import PurchaseWithInstallmentsResponse
 
 class CartItemBase(BaseModel):
     product_id: int
@@ -28,4 +29,12 @@ class CartResponse(BaseModel):
     total_amount: float
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CartCheckout(BaseModel):
+    number_of_installments: int = Field(1, ge=1, le=36, description="Installments per purchase")
+    days_between_installments: int = Field(30, ge=1, description="Days between installment due dates")
+
+class CheckoutResponse(BaseModel):
+    purchases: List[PurchaseWithInstallmentsResponse]
+    total_amount: float
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+class QueryLogSettings(BaseModel):
+    enabled: bool
+    sample_rate: float
+    slow_query_ms: float
+    repeat_threshold: int
+
+class QueryLogUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    sample_rate: Optional[float] = Field(None, ge=0, le=1, description="Fraction of requests to trace")
+    slow_query_ms: Optional[float] = Field(None, ge=0)
+    repeat_threshold: Optional[int] = Field(None, ge=2, description="Identical statements per request flagged as N+1")
+
+class SlowQuery(BaseModel):
+    statement: str
+    duration_ms: float
+    call_site: str
+
+class RepeatedQuery(BaseModel):
+    statement: str
+    count: int
+    total_ms: float
+    call_sites: list[str]
+
+class QueryReport(BaseModel):
+    at: datetime
+    method: str
+    route: str
+    status: int
+    queries: int
+    slow: list[SlowQuery]
+    repeated: list[RepeatedQuery]
@@ -1,4 +1,7 @@
 from pydantic import BaseModel, Field, validator
+from typing import Optional
+from datetime import datetime
+from enum import Enum
 
 class NotificationBase(BaseModel):
     message: str
@@ -18,9 +21,10 @@ class NotificationResponse(NotificationBase):
 
 class NotificationListResponse(BaseModel):
     items: list[NotificationResponse]
-    total: int
+    total: Optional[int]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 class PurchaseNotificationCreate(BaseModel):
     message: str = Field(
@@ -35,3 +39,25 @@ class PurchaseNotificationCreate(BaseModel):
         if not v.strip():
             raise ValueError('Message cannot be empty or just whitespace')
         return v.strip()
+
+class BulkNotificationAudienceEnum(str, Enum):
+    all_customers = "all_customers"
+    overdue_installments = "overdue_installments"
+
+class BulkNotificationCreate(NotificationBase):
+    audience: BulkNotificationAudienceEnum
+    message: str = Field(..., min_length=1, max_length=500)
+
+class NotificationJobResponse(BaseModel):
+    id: int
+    audience: str
+    notification_type: str
+    status: str
+    total: Optional[int]
+    processed: int
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -31,9 +31,10 @@ class ProductResponse(ProductBase):
 
 class ProductListResponse(BaseModel):
     items: list[ProductResponse]
-    total: int
+    total: Optional[int]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 # Avoid circular import
 from app.api.schemas.categories import CategoryResponse
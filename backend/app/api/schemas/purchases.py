@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from datetime import datetime, timedelta
 from app.api.schemas.installments import InstallmentResponse
 from pydantic import BaseModel, Field, validator
@@ -56,3 +56,11 @@ class PurchaseWithInstallmentsResponse(PurchaseResponse):
 
     class Config:
         from_attributes = True
+
+class PurchaseListResponse(BaseModel):
+    items: List[PurchaseWithInstallmentsResponse]
+    total: Optional[int]
+    page: int
+    page_size: int
+    total_pages: Optional[int]
+    next_cursor: Optional[str] = None
@@ -1,4 +1,5 @@
 from datetime import date
+from typing import List
 from pydantic import BaseModel, validator
 
 class ReportRequest(BaseModel):
@@ -12,8 +13,16 @@ class ReportRequest(BaseModel):
             raise ValueError('End date must be after start date')
         return end_date
 
+class ReportBucket(BaseModel):
+    start_date: date
+    end_date: date
+    paid_amount: float
+    due_amount: float
+
 class ReportResponse(BaseModel):
     weekly_paid_amount: float
     weekly_due_amount: float
     monthly_paid_amount: float
     monthly_due_amount: float
+    weekly: List[ReportBucket] = []
+    monthly: List[ReportBucket] = []
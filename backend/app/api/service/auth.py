@@ -1,18 +1,30 @@
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 from app.db import models
-from app.core.security import get_password_hash, verify_password
-from app.core.email_utils import send_email
+from app.core.security import (
+    get_password_hash,
+    verify_password,
+    password_needs_rehash,
+    hash_password_async,
+    verify_password_async
+)
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from app.core.email_utils import queue_email
+from app.core.cache import user_cache
 import random
 from fastapi import HTTPException, status
 
-def create_user(db: Session, user_data):
+def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def create_user(db: Session, user_data, hashed_password: Optional[str] = None):
     # Generate OTP with 5 minute expiry
     otp = str(random.randint(100000, 999999))
     otp_expiry = datetime.utcnow() + timedelta(minutes=5)
     
-    # Hash the password before storing
-    hashed_password = get_password_hash(user_data.password)
+    # Hash the password before storing, unless the caller already did
+    hashed_password = hashed_password or get_password_hash(user_data.password)
     
     db_user = models.User(
         email=user_data.email,
@@ -28,13 +40,13 @@ def create_user(db: Session, user_data):
     db.refresh(db_user)
     return db_user
 
-def create_user_admin(db: Session, user_data):
+def create_user_admin(db: Session, user_data, hashed_password: Optional[str] = None):
     # Generate OTP with 5 minute expiry
     otp = str(random.randint(100000, 999999))
     otp_expiry = datetime.utcnow() + timedelta(minutes=5)
     
-    # Hash the password before storing
-    hashed_password = get_password_hash(user_data.password)
+    # Hash the password before storing, unless the caller already did
+    hashed_password = hashed_password or get_password_hash(user_data.password)
     
     db_user = models.User(
         email=user_data.email,
@@ -60,6 +72,7 @@ def verify_otp(db: Session, email: str, otp: str):
     user.is_verified = True
     user.otp = None
     db.commit()
+    user_cache.delete(user.email)
     return user
 
 def authenticate_user(db: Session, email: str, password: str):
@@ -70,10 +83,35 @@ def authenticate_user(db: Session, email: str, password: str):
         return user
     return user
 
-def send_otp_email(email: str, otp: str):
+async def authenticate_user_async(db: Session, email: str, password: str):
+    """Authenticate with bcrypt running in the hashing pool.
+
+    Hashes made with an outdated cost factor are transparently replaced.
+    """
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    if not user or not await verify_password_async(password, user.hashed_password):
+        return None
+    if password_needs_rehash(user.hashed_password):
+        hashed_password = await hash_password_async(password)
+        await run_in_threadpool(set_user_password, db, user, hashed_password)
+    return user
+
+def send_verification_otp(db: Session, user: models.User) -> None:
+    """Issue a fresh OTP to an unverified user and email it"""
+    user.otp = str(random.randint(100000, 999999))
+    user.otp_expiry = datetime.utcnow() + timedelta(minutes=5)
+    queue_otp_email(db, user.email, user.otp)
+    db.commit()
+    db.refresh(user)
+
+def queue_otp_email(db: Session, email: str, otp: str):
     subject = "Your Verification Code"
     message = f"Your OTP code is: {otp}"
-    send_email(email, subject, message)
+    queue_email(db, email, subject, message)
+
+def send_otp_email(db: Session, email: str, otp: str):
+    queue_otp_email(db, email, otp)
+    db.commit()
 
 def resend_otp(db: Session, email: str) -> dict:
     """
@@ -100,10 +138,10 @@ def resend_otp(db: Session, email: str) -> dict:
     # Update user with new OTP
     user.otp = otp
     user.otp_expiry = otp_expiry
-    db.commit()
     
-    # Send OTP email
-    send_otp_email(user.email, otp)
+    # Queue OTP email with the OTP update
+    queue_otp_email(db, user.email, otp)
+    db.commit()
     
     return {
         "email": user.email,
@@ -126,20 +164,20 @@ def initiate_password_reset(db: Session, email: str) -> dict:
     
     user.otp = otp
     user.otp_expiry = otp_expiry
-    db.commit()
     
     subject = "Password Reset Request"
     message = f"Your password reset OTP is: {otp}. This code will expire in 5 minutes."
-    send_email(user.email, subject, message)
+    queue_email(db, user.email, subject, message)
+    db.commit()
     
     return {
         "message": "Password reset OTP has been sent to your email",
         "email": user.email
     }
 
-def reset_password(db: Session, email: str, otp: str, new_password: str) -> dict:
+def get_password_reset_user(db: Session, email: str, otp: str) -> models.User:
     """
-    Reset user password using OTP
+    Return the user if the password reset OTP is valid
     """
     user = db.query(models.User).filter(models.User.email == email).first()
     if not user:
@@ -160,9 +198,32 @@ def reset_password(db: Session, email: str, otp: str, new_password: str) -> dict
             detail="OTP has expired"
         )
 
-    user.hashed_password = get_password_hash(new_password)
+    return user
+
+def set_user_password(db: Session, user: models.User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+    user_cache.delete(user.email)
+
+def complete_password_reset(db: Session, user: models.User, hashed_password: str) -> None:
     user.otp = None  
     user.otp_expiry = None
-    db.commit()
+    set_user_password(db, user, hashed_password)
+
+def reset_password(db: Session, email: str, otp: str, new_password: str) -> dict:
+    """
+    Reset user password using OTP
+    """
+    user = get_password_reset_user(db, email, otp)
+    complete_password_reset(db, user, get_password_hash(new_password))
+    return {"message": "Password has been reset successfully"}
 
+async def reset_password_async(db: Session, email: str, otp: str, new_password: str) -> dict:
+    """
+    Reset user password using OTP, hashing in the worker pool
+    """
+    user = await run_in_threadpool(get_password_reset_user, db, email, otp)
+    hashed_password = await hash_password_async(new_password)
+    await run_in_threadpool(complete_password_reset, db, user, hashed_password)
     return {"message": "Password has been reset successfully"}
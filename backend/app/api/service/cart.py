@@ -1,15 +1,43 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from typing import List, Optional
+from datetime import datetime, timedelta
+from decimal import Decimal
 from app.db import models
-from app.api.schemas.cart import CartItemCreate, CartItemUpdate
+from app.api.schemas.cart import CartItemCreate, CartItemUpdate, CartCheckout
+from app.api.service.rollups import record_new_purchases
+from app.api.service.products import reserve_stock, invalidate_catalog
+from app.api.service.installments import installment_stats_cache
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.exc import IntegrityError
 
-def get_cart_items(db: Session, user_id: int) -> List[models.CartItem]:
-    """Get all cart items for a user"""
-    return db.query(models.CartItem).filter(
+def _cart_items_select(user_id: int):
+    return select(models.CartItem).options(
+        joinedload(models.CartItem.product).joinedload(models.Product.category)
+    ).where(
         models.CartItem.user_id == user_id
-    ).all()
+    ).order_by(models.CartItem.id)
+
+def _cart_summary(items: List[models.CartItem]) -> dict:
+    return {
+        "items": items,
+        "total_items": sum(item.quantity for item in items),
+        "total_amount": sum(item.quantity * item.product.price for item in items)
+    }
+
+def get_cart_items(db: Session, user_id: int) -> List[models.CartItem]:
+    """Get all cart items for a user, with product and category loaded in the same query"""
+    return db.scalars(_cart_items_select(user_id)).all()
+
+def get_cart(db: Session, user_id: int) -> dict:
+    """Get a user's cart items and totals from a single query"""
+    return _cart_summary(get_cart_items(db, user_id))
+
+async def get_cart_async(db: AsyncSession, user_id: int) -> dict:
+    """Get a user's cart items and totals from a single query"""
+    items = (await db.scalars(_cart_items_select(user_id))).all()
+    return _cart_summary(items)
 
 def add_to_cart(db: Session, user_id: int, cart_item: CartItemCreate) -> models.CartItem:
     """Add item to cart or update quantity if already exists"""
@@ -117,5 +145,144 @@ def clear_cart(db: Session, user_id: int) -> None:
 
 def get_cart_total(db: Session, user_id: int) -> float:
     """Calculate total amount in cart"""
-    cart_items = get_cart_items(db, user_id)
-    return sum(item.quantity * item.product.price for item in cart_items)
\ No newline at end of file
+    total = db.query(
+        func.sum(models.CartItem.quantity * models.Product.price)
+    ).join(
+        models.Product,
+        models.CartItem.product_id == models.Product.id
+    ).filter(
+        models.CartItem.user_id == user_id
+    ).scalar()
+    return float(total or 0)
+
+def _split_amount(total_amount: float, parts: int) -> List[float]:
+    """Split an amount into equal installments, the last one absorbing rounding"""
+    total = Decimal(str(total_amount))
+    share = (total / parts).quantize(Decimal("0.01"))
+    return [float(share)] * (parts - 1) + [float(total - share * (parts - 1))]
+
+def checkout_cart(db: Session, user_id: int, checkout: CartCheckout) -> dict:
+    """Turn every cart line into a purchase with an equal installment plan, in one transaction"""
+    lines = db.query(models.CartItem.product_id, models.CartItem.quantity).filter(
+        models.CartItem.user_id == user_id
+    ).all()
+    if not lines:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cart is empty"
+        )
+
+    quantities = {product_id: quantity for product_id, quantity in lines}
+
+    try:
+        # Lock the products up front so concurrent checkouts queue behind us
+        products = {
+            product.id: product
+            for product in db.query(
+                models.Product.id,
+                models.Product.name,
+                models.Product.price,
+                models.Product.stock,
+                models.Product.category_id
+            ).filter(
+                models.Product.id.in_(quantities)
+            ).with_for_update().all()
+        }
+
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if not product:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Product {product_id} not found"
+                )
+            if product.stock < quantity:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Insufficient stock for {product.name}. Available: {product.stock}, Requested: {quantity}"
+                )
+
+        purchase_date = datetime.utcnow()
+        if not reserve_stock(db, quantities, purchase_date):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Stock changed during checkout, please try again"
+            )
+
+        totals = {
+            product_id: float(Decimal(str(products[product_id].price)) * Decimal(str(quantity)))
+            for product_id, quantity in quantities.items()
+        }
+        purchase_rows = db.execute(
+            # Each cart line is a distinct product, so product_id maps rows back without
+            # sort_by_parameter_order, which would cost SQLite one INSERT per row
+            insert(models.Purchase).returning(
+                models.Purchase.id,
+                models.Purchase.product_id
+            ),
+            [
+                {
+                    "user_id": user_id,
+                    "product_id": product_id,
+                    "quantity": quantity,
+                    "total_amount": totals[product_id],
+                    "paid_amount": 0,
+                    "due_amount": totals[product_id],
+                    "number_of_installments": checkout.number_of_installments,
+                    "status": models.PaymentStatusEnum.pending.value,
+                    "created_at": purchase_date
+                }
+                for product_id, quantity in quantities.items()
+            ]
+        ).all()
+
+        installment_rows = []
+        for purchase_id, product_id in purchase_rows:
+            amounts = _split_amount(totals[product_id], checkout.number_of_installments)
+            for i, amount in enumerate(amounts, start=1):
+                installment_rows.append({
+                    "purchase_id": purchase_id,
+                    "installment_no": i,
+                    "amount": amount,
+                    "due_date": purchase_date + timedelta(days=checkout.days_between_installments * i),
+                    "is_paid": False,
+                    "status": models.PaymentStatusEnum.pending.value,
+                    "paid_date": None
+                })
+        db.execute(insert(models.Installment), installment_rows)
+
+        category_totals = {}
+        for product_id, amount in totals.items():
+            count, category_amount, installments = category_totals.get(products[product_id].category_id, (0, 0.0, 0))
+            category_totals[products[product_id].category_id] = (
+                count + 1,
+                category_amount + amount,
+                installments + checkout.number_of_installments
+            )
+        record_new_purchases(db, purchase_date.date(), category_totals)
+
+        db.execute(delete(models.CartItem).where(models.CartItem.user_id == user_id))
+        db.commit()
+
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to process checkout"
+        )
+
+    installment_stats_cache.delete(user_id)
+    invalidate_catalog()
+    purchases = db.query(models.Purchase).options(
+        selectinload(models.Purchase.purchase_installments)
+    ).filter(
+        models.Purchase.id.in_([purchase_id for purchase_id, _ in purchase_rows])
+    ).order_by(models.Purchase.id).all()
+
+    return {
+        "purchases": purchases,
+        "total_amount": sum(totals.values())
+    }
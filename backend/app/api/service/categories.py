@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 from typing import Tuple
 from app.db import models
 from app.api.schemas.categories import CategoryCreate, CategoryUpdate
+from app.api.service.products import invalidate_catalog
 
 def get_categories(
     db: Session, 
@@ -70,6 +71,7 @@ def update_category(
         setattr(category, field, value)
     
     db.commit()
+    invalidate_catalog()
     db.refresh(category)
     return category
 
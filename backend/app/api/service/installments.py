@@ -1,9 +1,17 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import models
 from datetime import datetime
 from fastapi import HTTPException, status
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, func, select, update
 from typing import Optional, Literal
+from app.api.service.rollups import move_installments, move_purchase
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import keyset_columns, next_cursor, count_select, page_select
+
+# Per-user installment stats, keyed by user id
+installment_stats_cache = TTLCache(max_size=4096, ttl=settings.INSTALLMENT_STATS_CACHE_TTL)
 
 def pay_installment(db: Session, installment_id: int, user_id: int):
     installment = db.query(models.Installment).filter(models.Installment.id == installment_id).first()
@@ -20,22 +28,49 @@ def pay_installment(db: Session, installment_id: int, user_id: int):
         )
 
     try:
+        purchase = installment.purchase
+        old_installment_status = installment.status
+        old_purchase = (purchase.status, purchase.paid_amount, purchase.due_amount)
+
         # Update installment
         installment.is_paid = True
         installment.status = models.PaymentStatusEnum.paid.value
         installment.paid_date = datetime.utcnow()
 
         # Update purchase
-        purchase = installment.purchase
         purchase.paid_amount += installment.amount
         purchase.due_amount = purchase.total_amount - purchase.paid_amount
         
         if purchase.paid_amount >= purchase.total_amount:
             purchase.status = models.PaymentStatusEnum.paid.value
+        elif purchase.status == models.PaymentStatusEnum.overdue.value:
+            # Back to pending once no other installment is overdue
+            other_overdue = db.query(models.Installment.id).filter(
+                models.Installment.purchase_id == purchase.id,
+                models.Installment.id != installment.id,
+                models.Installment.status == models.PaymentStatusEnum.overdue.value
+            ).first()
+            if not other_overdue:
+                purchase.status = models.PaymentStatusEnum.pending.value
         
         purchase.updated_at = datetime.utcnow()
 
+        # Keep the daily rollup in step within the same transaction
+        day = purchase.created_at.date()
+        category_id = purchase.product.category_id
+        move_installments(
+            db, day, category_id,
+            old_installment_status, installment.status,
+            1, installment.amount
+        )
+        move_purchase(
+            db, day, category_id,
+            old_purchase,
+            (purchase.status, purchase.paid_amount, purchase.due_amount)
+        )
+
         db.commit()
+        installment_stats_cache.delete(purchase.user_id)
         db.refresh(installment)
         db.refresh(purchase)
 
@@ -47,36 +82,108 @@ def pay_installment(db: Session, installment_id: int, user_id: int):
             detail="Failed to process payment"
         )
 
+def mark_overdue_installments(db: Session, now: Optional[datetime] = None, batch_size: int = 500) -> dict:
+    """Flip pending installments past their due date to overdue, batch by batch.
 
+    Each batch is one UPDATE ... RETURNING over the (status, due_date) index and
+    is committed together with the matching purchase status and rollup changes.
+    """
+    now = now or datetime.utcnow()
+    pending = models.PaymentStatusEnum.pending.value
+    overdue = models.PaymentStatusEnum.overdue.value
+    touched = {"installments": 0, "purchases": 0, "batches": 0}
 
-def get_user_installments(
-    db: Session,
+    while True:
+        due_ids = select(models.Installment.id).where(
+            models.Installment.status == pending,
+            models.Installment.due_date < now
+        ).order_by(models.Installment.due_date).limit(batch_size).scalar_subquery()
+
+        # Re-checking the status keeps concurrent payments and sweeps safe
+        flipped = db.execute(
+            update(models.Installment)
+            .where(models.Installment.id.in_(due_ids), models.Installment.status == pending)
+            .values(status=overdue)
+            .returning(models.Installment.purchase_id, models.Installment.amount)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not flipped:
+            db.rollback()
+            break
+
+        purchase_ids = {purchase_id for purchase_id, _ in flipped}
+        purchases = {
+            row.id: row for row in db.query(
+                models.Purchase.id,
+                models.Purchase.user_id,
+                models.Purchase.created_at,
+                models.Product.category_id
+            ).join(
+                models.Product,
+                models.Purchase.product_id == models.Product.id
+            ).filter(models.Purchase.id.in_(purchase_ids)).all()
+        }
+
+        moved = {}
+        for purchase_id, amount in flipped:
+            purchase = purchases[purchase_id]
+            key = (purchase.created_at.date(), purchase.category_id)
+            count, total = moved.get(key, (0, 0.0))
+            moved[key] = (count + 1, total + amount)
+        for (day, category_id), (count, total) in moved.items():
+            move_installments(db, day, category_id, pending, overdue, count, total)
+
+        overdue_purchases = db.execute(
+            update(models.Purchase)
+            .where(models.Purchase.id.in_(purchase_ids), models.Purchase.status == pending)
+            .values(status=overdue, updated_at=now)
+            .returning(models.Purchase.id, models.Purchase.paid_amount, models.Purchase.due_amount)
+            .execution_options(synchronize_session=False)
+        ).all()
+        for purchase_id, paid_amount, due_amount in overdue_purchases:
+            purchase = purchases[purchase_id]
+            move_purchase(
+                db, purchase.created_at.date(), purchase.category_id,
+                (pending, paid_amount, due_amount),
+                (overdue, paid_amount, due_amount)
+            )
+
+        db.commit()
+        for purchase in purchases.values():
+            installment_stats_cache.delete(purchase.user_id)
+
+        touched["installments"] += len(flipped)
+        touched["purchases"] += len(overdue_purchases)
+        touched["batches"] += 1
+
+    return touched
+
+def _filter_installments(
+    stmt,
     user_id: Optional[int],
-    page: int = 1,
-    page_size: int = 10,
-    status: Optional[str] = None,
-    is_paid: Optional[bool] = None,
-    sort_by: Optional[str] = None,
-    sort_order: str = "desc",
-    is_admin: bool = False
+    status: Optional[str],
+    is_paid: Optional[bool],
+    is_admin: bool
 ):
-    query = db.query(models.Installment).join(
+    """Join an installment select to purchases and apply the listing filters"""
+    stmt = stmt.join(
         models.Purchase,
         models.Installment.purchase_id == models.Purchase.id
     )
     
     if not is_admin:
-        query = query.filter(models.Purchase.user_id == user_id)
+        stmt = stmt.where(models.Purchase.user_id == user_id)
     elif user_id:  
-        query = query.filter(models.Purchase.user_id == user_id)
+        stmt = stmt.where(models.Purchase.user_id == user_id)
     
     if status:
-        query = query.filter(models.Installment.status == status)
+        stmt = stmt.where(models.Installment.status == status)
         
     if is_paid is not None:
-        query = query.filter(models.Installment.is_paid == is_paid)
-    
-    # Apply sorting
+        stmt = stmt.where(models.Installment.is_paid == is_paid)
+    return stmt
+
+def _installment_sort_column(sort_by: Optional[str]):
     valid_sort_columns = {
         "due_date": models.Installment.due_date,
         "amount": models.Installment.amount,
@@ -85,53 +192,152 @@ def get_user_installments(
         "installment_no": models.Installment.installment_no,
         "status": models.Installment.status
     }
+    return valid_sort_columns.get(sort_by, models.Installment.due_date)
+
+def _user_installments_statements(
+    user_id: Optional[int],
+    page: int,
+    page_size: int,
+    status: Optional[str],
+    is_paid: Optional[bool],
+    sort_by: Optional[str],
+    sort_order: str,
+    is_admin: bool,
+    after: Optional[str]
+):
+    """Count and page statements for installment listings, shared by the sync and async paths"""
+    stmt = _filter_installments(select(models.Installment), user_id, status, is_paid, is_admin)
     
-    sort_column = valid_sort_columns.get(sort_by, models.Installment.due_date)
-    if sort_order == "asc":
-        query = query.order_by(asc(sort_column))
-    else:
-        query = query.order_by(desc(sort_column))
-    
-    # Apply pagination
-    total = query.count()
-    installments = query.offset((page - 1) * page_size).limit(page_size).all()
-    
+    # Apply sorting
+    sort_column = _installment_sort_column(sort_by)
+    if after and sort_column is models.Installment.paid_date:
+        raise HTTPException(
+            status_code=400,
+            detail="Cursor pagination is not supported when sorting by paid_date"
+        )
+
+    # A cursor replaces the page offset
+    columns = keyset_columns(sort_column, models.Installment.id)
+    page_stmt = page_select(
+        stmt, columns,
+        descending=sort_order != "asc",
+        after=after,
+        offset=(page - 1) * page_size,
+        limit=page_size
+    )
+    return count_select(stmt), page_stmt, columns
+
+def installments_export_select(
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    is_paid: Optional[bool] = None,
+    sort_by: Optional[str] = "due_date",
+    sort_order: str = "desc"
+):
+    """Plain-column select of every installment matching the admin listing filters, in listing order"""
+    stmt = _filter_installments(
+        select(
+            models.Installment.id,
+            models.Installment.purchase_id,
+            models.Purchase.user_id,
+            models.Installment.installment_no,
+            models.Installment.amount,
+            models.Installment.due_date,
+            models.Installment.paid_date,
+            models.Installment.status,
+            models.Installment.is_paid
+        ),
+        user_id, status, is_paid, is_admin=True
+    )
+    order = asc if sort_order == "asc" else desc
+    return stmt.order_by(order(_installment_sort_column(sort_by)), order(models.Installment.id))
+
+def _installment_page(installments, total: Optional[int], page: int, page_size: int, columns) -> dict:
     return {
         "items": installments,
         "total": total,
         "page": page,
         "page_size": page_size,
-        "total_pages": (total + page_size - 1) // page_size
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": next_cursor(installments, page_size, columns)
     }
 
+def get_user_installments(
+    db: Session,
+    user_id: Optional[int],
+    page: int = 1,
+    page_size: int = 10,
+    status: Optional[str] = None,
+    is_paid: Optional[bool] = None,
+    sort_by: Optional[str] = None,
+    sort_order: str = "desc",
+    is_admin: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = True
+):
+    count, page_stmt, columns = _user_installments_statements(
+        user_id, page, page_size, status, is_paid, sort_by, sort_order, is_admin, after
+    )
+    total = db.scalar(count) if include_total else None
+    installments = db.scalars(page_stmt).all()
+    return _installment_page(installments, total, page, page_size, columns)
+
+async def get_user_installments_async(
+    db: AsyncSession,
+    user_id: Optional[int],
+    page: int = 1,
+    page_size: int = 10,
+    status: Optional[str] = None,
+    is_paid: Optional[bool] = None,
+    sort_by: Optional[str] = None,
+    sort_order: str = "desc",
+    is_admin: bool = False,
+    after: Optional[str] = None,
+    include_total: bool = True
+):
+    count, page_stmt, columns = _user_installments_statements(
+        user_id, page, page_size, status, is_paid, sort_by, sort_order, is_admin, after
+    )
+    total = await db.scalar(count) if include_total else None
+    installments = (await db.scalars(page_stmt)).all()
+    return _installment_page(installments, total, page, page_size, columns)
+
 def get_user_installment_stats(db: Session, user_id: int) -> dict:
-    # Query all installments for the user
-    installments = db.query(models.Installment)\
-        .join(models.Purchase)\
-        .filter(models.Purchase.user_id == user_id)\
-        .all()
-    
-    # Initialize counters
+    cached = installment_stats_cache.get(user_id)
+    if cached is not None:
+        return dict(cached)
+
+    # Count and sum the user's installments per status in one query
+    rows = db.query(
+        models.Installment.status,
+        func.count(models.Installment.id).label("count"),
+        func.sum(models.Installment.amount).label("amount")
+    ).join(
+        models.Purchase,
+        models.Installment.purchase_id == models.Purchase.id
+    ).filter(
+        models.Purchase.user_id == user_id
+    ).group_by(models.Installment.status).all()
+
     stats = {
         "paid": 0,
         "pending": 0,
         "overdue": 0,
-        "total": len(installments),
+        "total": 0,
         "total_paid_amount": 0.0,
         "total_pending_amount": 0.0,
         "total_overdue_amount": 0.0
     }
-    
-    # Calculate stats
-    for installment in installments:
-        if installment.status == models.PaymentStatusEnum.paid.value:
-            stats["paid"] += 1
-            stats["total_paid_amount"] += installment.amount
-        elif installment.status == models.PaymentStatusEnum.pending.value:
-            stats["pending"] += 1
-            stats["total_pending_amount"] += installment.amount
-        elif installment.status == models.PaymentStatusEnum.overdue.value:
-            stats["overdue"] += 1
-            stats["total_overdue_amount"] += installment.amount
-    
-    return stats
+
+    for row in rows:
+        stats["total"] += row.count
+        if row.status in (
+            models.PaymentStatusEnum.paid.value,
+            models.PaymentStatusEnum.pending.value,
+            models.PaymentStatusEnum.overdue.value
+        ):
+            stats[row.status] = row.count
+            stats[f"total_{row.status}_amount"] = float(row.amount or 0)
+
+    installment_stats_cache.set(user_id, stats)
+    return dict(stats)
@@ -1,27 +1,44 @@
 from app.db import models
-from app.core.email_utils import send_email
+from app.core.email_utils import queue_email
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from typing import Tuple
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, exists, insert, select
+from datetime import datetime
 from app.core.security import is_admin
+from app.core.pagination import keyset_columns, apply_keyset, next_cursor
+from typing import Optional
+from app.api.schemas.notifications import BulkNotificationAudienceEnum
 
-def get_notifications(db: Session,current_user: models.User, skip: int = 0, limit: int = 10, order_by: str = "created_at",) -> Tuple[list[models.Notification], int]:
+NOTIFICATION_JOB_CHUNK_SIZE = 1000
+
+def get_notifications(
+    db: Session,
+    current_user: models.User,
+    skip: int = 0,
+    limit: int = 10,
+    order_by: str = "created_at",
+    after: Optional[str] = None,
+    include_total: bool = True
+) -> Tuple[list[models.Notification], Optional[int], Optional[str]]:
     if order_by == "id":
-        order = desc(models.Notification.id)
-    elif order_by == "created_at":
-        order = desc(models.Notification.created_at)
+        sort_column = models.Notification.id
     else:
-        order = desc(models.Notification.created_at)
+        sort_column = models.Notification.created_at
 
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admins can create notifications"
         )
-    notifications = db.query(models.Notification).order_by(order).offset(skip).limit(limit).all()
-    total = db.query(models.Notification).count()
-    return notifications, total
+    total = db.query(models.Notification).count() if include_total else None
+
+    columns = keyset_columns(sort_column, models.Notification.id)
+    query = apply_keyset(db.query(models.Notification), columns, descending=True, after=after)
+    if not after:
+        query = query.offset(skip)
+    notifications = query.limit(limit).all()
+    return notifications, total, next_cursor(notifications, limit, columns)
 
 def create_notification(db: Session, notification_data, current_user: models.User) -> models.Notification:
     if not is_admin(current_user):
@@ -36,15 +53,14 @@ def create_notification(db: Session, notification_data, current_user: models.Use
         )
     notification = models.Notification(**notification_data.model_dump())
     db.add(notification)
-    db.commit()
-    from app.core.email_utils import send_email
-
-    db.refresh(notification)
 
     if notification.notification_type == "email":
         user = db.query(models.User).filter(models.User.id == notification.user_id).first()
         if user:
-            send_email(to_email=user.email, subject="New Notification", body=notification.message)
+            queue_email(db, to_email=user.email, subject="New Notification", body=notification.message)
+
+    db.commit()
+    db.refresh(notification)
 
     return notification
 
@@ -76,15 +92,105 @@ def send_purchase_notification(
     
     notification = models.Notification(**notification_data)
     db.add(notification)
-    db.commit()
-    db.refresh(notification)
     
     user = db.query(models.User).filter(models.User.id == purchase.user_id).first()
     if user:
-        send_email(
+        queue_email(
+            db,
             to_email=user.email,
             subject=f"Purchase Installment Information",
             body=notification.message
         )
+
+    db.commit()
+    db.refresh(notification)
     
     return notification
+
+def create_notification_job(db: Session, job_data, current_user: models.User) -> models.NotificationJob:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can create notifications"
+        )
+
+    job = models.NotificationJob(
+        created_by=current_user.id,
+        audience=job_data.audience.value,
+        message=job_data.message,
+        notification_type=job_data.notification_type
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def get_notification_job(db: Session, job_id: int, current_user: models.User) -> models.NotificationJob:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view notification jobs"
+        )
+
+    job = db.query(models.NotificationJob).filter(models.NotificationJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification job not found"
+        )
+    return job
+
+def _audience_query(audience: str):
+    query = select(models.User.id, models.User.email).where(
+        models.User.role == models.RoleEnum.customer.value
+    )
+    if audience == BulkNotificationAudienceEnum.overdue_installments.value:
+        query = query.where(exists().where(
+            models.Purchase.user_id == models.User.id,
+            models.Installment.purchase_id == models.Purchase.id,
+            models.Installment.status == models.PaymentStatusEnum.overdue.value
+        ))
+    return query.order_by(models.User.id)
+
+def process_notification_job(db: Session, job_id: int) -> None:
+    """Fan a job's message out to its audience with bulk inserts, committing per chunk"""
+    job = db.query(models.NotificationJob).filter(models.NotificationJob.id == job_id).first()
+    if not job or job.status != models.JobStatusEnum.pending.value:
+        return
+
+    try:
+        recipients = db.execute(_audience_query(job.audience)).all()
+        job.status = models.JobStatusEnum.running.value
+        job.total = len(recipients)
+        db.commit()
+
+        for start in range(0, len(recipients), NOTIFICATION_JOB_CHUNK_SIZE):
+            chunk = recipients[start:start + NOTIFICATION_JOB_CHUNK_SIZE]
+            db.execute(insert(models.Notification), [
+                {
+                    "user_id": user_id,
+                    "message": job.message,
+                    "notification_type": job.notification_type
+                }
+                for user_id, _ in chunk
+            ])
+            if job.notification_type == "email":
+                db.execute(insert(models.EmailOutbox), [
+                    {
+                        "to_email": email,
+                        "subject": "New Notification",
+                        "body": job.message
+                    }
+                    for _, email in chunk
+                ])
+            job.processed += len(chunk)
+            db.commit()
+
+        job.status = models.JobStatusEnum.completed.value
+    except Exception as e:
+        db.rollback()
+        job.status = models.JobStatusEnum.failed.value
+        job.error = str(e)[:500]
+
+    job.finished_at = datetime.utcnow()
+    db.commit()
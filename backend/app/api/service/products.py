@@ -1,9 +1,50 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import case, column, func, literal_column, select, table, update
 from app.db import models
-from app.api.schemas.products import ProductCreate, ProductUpdate
+from app.api.schemas.products import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
 from datetime import datetime
+from hashlib import sha1
+import re
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import keyset_columns, next_cursor, count_select, page_select
+
+# Serialized public catalog responses as (body, etag); cleared on any catalog write
+catalog_cache = TTLCache(max_size=settings.CATALOG_CACHE_MAX_SIZE, ttl=settings.CATALOG_CACHE_TTL)
+
+def invalidate_catalog() -> None:
+    """Drop cached catalog responses; call after committing product, category or stock changes"""
+    catalog_cache.clear()
+
+def _serialize(response) -> Tuple[bytes, str]:
+    body = response.model_dump_json().encode()
+    return body, f'"{sha1(body).hexdigest()}"'
+
+def reserve_stock(db: Session, quantities: Dict[int, int], now: Optional[datetime] = None) -> bool:
+    """Atomically take quantities (product id -> amount) out of stock.
+
+    Runs one conditional UPDATE, so concurrent buyers can never oversell.
+    Returns False when any product is short; the caller must then roll back,
+    since the products that did have enough stock were decremented.
+    """
+    if len(quantities) == 1:
+        [(product_id, requested)] = quantities.items()
+    else:
+        requested = case(quantities, value=models.Product.id)
+
+    result = db.execute(
+        update(models.Product)
+        .where(
+            models.Product.id.in_(quantities),
+            models.Product.stock >= requested
+        )
+        .values(stock=models.Product.stock - requested, updated_at=now or datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == len(quantities)
 
 def create_product(db: Session, product_data: ProductCreate) -> models.Product:
     category = db.query(models.Category).filter(
@@ -18,26 +59,153 @@ def create_product(db: Session, product_data: ProductCreate) -> models.Product:
     product = models.Product(**product_data.model_dump())
     db.add(product)
     db.commit()
+    invalidate_catalog()
     db.refresh(product)
     return product
 
+def _products_statements(category_id: Optional[int], skip: int, limit: int, after: Optional[str]):
+    """Count and page statements for the product list, shared by the sync and async paths"""
+    stmt = select(models.Product)
+    if category_id:
+        stmt = stmt.where(models.Product.category_id == category_id)
+
+    columns = keyset_columns(models.Product.id, models.Product.id)
+    page = page_select(stmt, columns, descending=False, after=after, offset=skip, limit=limit)
+    return count_select(stmt), page.options(joinedload(models.Product.category)), columns
+
 def get_products(
     db: Session, 
     skip: int = 0, 
     limit: int = 10,
-    category_id: Optional[int] = None
-) -> Tuple[list[models.Product], int]:
-    query = db.query(models.Product)
-    
-    if category_id:
-        query = query.filter(models.Product.category_id == category_id)
-    
-    total = query.count()
-    products = query.offset(skip).limit(limit).all()
+    category_id: Optional[int] = None,
+    after: Optional[str] = None,
+    include_total: bool = True
+) -> Tuple[list[models.Product], Optional[int], Optional[str]]:
+    count, page, columns = _products_statements(category_id, skip, limit, after)
+    total = db.scalar(count) if include_total else None
+    products = db.scalars(page).all()
+    return products, total, next_cursor(products, limit, columns)
+
+async def get_products_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 10,
+    category_id: Optional[int] = None,
+    after: Optional[str] = None,
+    include_total: bool = True
+) -> Tuple[list[models.Product], Optional[int], Optional[str]]:
+    count, page, columns = _products_statements(category_id, skip, limit, after)
+    total = await db.scalar(count) if include_total else None
+    products = (await db.scalars(page)).all()
+    return products, total, next_cursor(products, limit, columns)
+
+async def get_catalog_page(
+    db: AsyncSession,
+    page: int = 1,
+    size: int = 10,
+    category_id: Optional[int] = None,
+    after: Optional[str] = None,
+    include_total: bool = True
+) -> Tuple[bytes, str]:
+    """Serialized product list page and its ETag, served from the catalog cache"""
+    key = ("list", page, size, category_id, after, include_total)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return cached
+
+    products, total, cursor = await get_products_async(
+        db,
+        skip=(page - 1) * size,
+        limit=size,
+        category_id=category_id,
+        after=after,
+        include_total=include_total
+    )
+    cached = _serialize(ProductListResponse(
+        items=products,
+        total=total,
+        page=page,
+        size=size,
+        next_cursor=cursor
+    ))
+    catalog_cache.set(key, cached)
+    return cached
+
+def _search_terms(q: str) -> List[str]:
+    # Reduce free text to plain words so user input can't break the query syntax
+    return re.findall(r"\w+", q.lower())
+
+def search_products(
+    db: Session,
+    q: str,
+    skip: int = 0,
+    limit: int = 10,
+    include_total: bool = True
+) -> Tuple[list[models.Product], Optional[int]]:
+    """Products whose name or description match every word of q (as a prefix), best match first"""
+    terms = _search_terms(q)
+    if not terms:
+        return [], 0 if include_total else None
+
+    if db.get_bind().dialect.name == "postgresql":
+        english = literal_column("'english'")
+        document = func.to_tsvector(
+            english,
+            func.coalesce(models.Product.name, literal_column("''"))
+            .op("||")(literal_column("' '"))
+            .op("||")(func.coalesce(models.Product.description, literal_column("''")))
+        )
+        tsquery = func.to_tsquery(english, " & ".join(f"{term}:*" for term in terms))
+        query = db.query(models.Product).filter(document.op("@@")(tsquery))
+        rank = func.ts_rank(document, tsquery).desc()
+    else:
+        products_fts = table("products_fts", column("rowid"), column("rank"))
+        query = db.query(models.Product).join(
+            products_fts,
+            products_fts.c.rowid == models.Product.id
+        ).filter(
+            literal_column("products_fts").op("MATCH")(" ".join(f'"{term}"*' for term in terms))
+        )
+        # FTS5's rank is bm25, lower is better
+        rank = products_fts.c.rank
+
+    total = query.count() if include_total else None
+    products = query.options(
+        joinedload(models.Product.category)
+    ).order_by(rank, models.Product.id).offset(skip).limit(limit).all()
     return products, total
 
+def get_catalog_search(
+    db: Session,
+    q: str,
+    page: int = 1,
+    size: int = 10,
+    include_total: bool = True
+) -> Tuple[bytes, str]:
+    """Serialized search results page and its ETag, served from the catalog cache"""
+    key = ("search", " ".join(_search_terms(q)), page, size, include_total)
+    cached = catalog_cache.get(key)
+    if cached is not None:
+        return cached
+
+    products, total = search_products(db, q, skip=(page - 1) * size, limit=size, include_total=include_total)
+    cached = _serialize(ProductListResponse(items=products, total=total, page=page, size=size))
+    catalog_cache.set(key, cached)
+    return cached
+
+def get_catalog_product(db: Session, product_id: int) -> Tuple[bytes, str]:
+    """Serialized product and its ETag, served from the catalog cache"""
+    key = ("product", product_id)
+    cached = catalog_cache.get(key)
+    if cached is None:
+        cached = _serialize(ProductResponse.model_validate(get_product(db, product_id)))
+        catalog_cache.set(key, cached)
+    return cached
+
 def get_product(db: Session, product_id: int) -> models.Product:
-    product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    product = db.query(models.Product).options(
+        joinedload(models.Product.category)
+    ).filter(models.Product.id == product_id).first()
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,6 +232,7 @@ def update_product(db: Session, product_id: int, product_data: ProductUpdate) ->
     
     product.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_catalog()
     db.refresh(product)
     return product
 
@@ -78,3 +247,4 @@ def delete_product(db: Session, product_id: int) -> None:
     
     db.delete(product)
     db.commit()
+    invalidate_catalog()
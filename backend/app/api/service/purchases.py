@@ -1,12 +1,17 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db import models
 from app.api.schemas.purchases import PurchaseCreate
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
-from sqlalchemy import update
+from sqlalchemy import select, update, insert
 from decimal import Decimal
 from typing import Optional, List, Tuple
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
+from app.api.service.rollups import record_purchase
+from app.api.service.products import reserve_stock, invalidate_catalog
+from app.api.service.installments import installment_stats_cache
+from app.core.pagination import keyset_columns, next_cursor, count_select, page_select
 
 def create_purchase(db: Session, purchase: PurchaseCreate, current_user_id: int):
     """Create a new purchase with custom installments"""
@@ -70,35 +75,45 @@ def create_purchase(db: Session, purchase: PurchaseCreate, current_user_id: int)
         )
         db.add(new_purchase)
         
-        # Update product stock
-        product.stock -= purchase.quantity
-        product.updated_at = purchase_date
-        db.add(product)
+        # Reserve stock atomically; a concurrent buyer may have taken it since the check above
+        if not reserve_stock(db, {product.id: purchase.quantity}, purchase_date):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Insufficient stock, it was taken by another purchase"
+            )
         
         # Flush to get the purchase ID
         db.flush()
 
-        # Create installments based on the plan
+        # Create installments based on the plan, in one batched INSERT whatever the plan length
+        installments = []
         for i, installment_plan in enumerate(purchase.installment_plan, start=1):
             due_date = purchase_date + timedelta(days=installment_plan.days_after)
             
-            installment = models.Installment(
-                purchase_id=new_purchase.id,
-                installment_no=i,
-                amount=installment_plan.amount,
-                due_date=due_date,
-                is_paid=False,
-                status=models.PaymentStatusEnum.pending.value,
-                paid_date=None
-            )
-            db.add(installment)
+            installments.append({
+                "purchase_id": new_purchase.id,
+                "installment_no": i,
+                "amount": installment_plan.amount,
+                "due_date": due_date,
+                "is_paid": False,
+                "status": models.PaymentStatusEnum.pending.value,
+                "paid_date": None
+            })
+        db.execute(insert(models.Installment), installments)
+
+        record_purchase(db, new_purchase, product.category_id, installments)
 
         # Commit the transaction
         db.commit()
+        installment_stats_cache.delete(purchase.user_id)
+        invalidate_catalog()
         db.refresh(new_purchase)
         
         return new_purchase
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -106,33 +121,107 @@ def create_purchase(db: Session, purchase: PurchaseCreate, current_user_id: int)
             detail="Failed to process purchase"
         )
 
+def _filter_purchases(stmt, user_id: Optional[int], status: Optional[str]):
+    """Apply the purchase listing filters to a select"""
+    # Apply user_id filter only if provided
+    if user_id is not None:
+        stmt = stmt.where(models.Purchase.user_id == user_id)
+    
+    if status:
+        stmt = stmt.where(models.Purchase.status == status)
+    return stmt
+
+def _purchase_ids_statements(
+    user_id: Optional[int],
+    page: int,
+    page_size: int,
+    status: Optional[str],
+    after: Optional[str]
+):
+    """Count and id-page statements for purchase listings, shared by the sync and async paths"""
+    # Page over purchase ids only, so LIMIT counts purchases rather than joined rows
+    stmt = _filter_purchases(select(models.Purchase.id, models.Purchase.created_at), user_id, status)
+
+    # Calculate offset unless continuing from a cursor
+    columns = keyset_columns(models.Purchase.created_at, models.Purchase.id)
+    page_stmt = page_select(
+        stmt, columns,
+        descending=True,
+        after=after,
+        offset=(page - 1) * page_size,
+        limit=page_size
+    )
+    return count_select(stmt), page_stmt, columns
+
+def purchases_export_select(user_id: Optional[int] = None, status: Optional[str] = None):
+    """Plain-column select of every purchase matching the admin listing filters, newest first"""
+    stmt = _filter_purchases(
+        select(
+            models.Purchase.id,
+            models.Purchase.user_id,
+            models.Purchase.product_id,
+            models.Purchase.quantity,
+            models.Purchase.total_amount,
+            models.Purchase.paid_amount,
+            models.Purchase.due_amount,
+            models.Purchase.number_of_installments,
+            models.Purchase.status,
+            models.Purchase.created_at,
+            models.Purchase.updated_at
+        ),
+        user_id, status
+    )
+    return stmt.order_by(models.Purchase.created_at.desc(), models.Purchase.id.desc())
+
+def _purchases_select(purchase_ids: List[int]):
+    # Load a page of purchases with their installments in one extra IN query
+    return select(models.Purchase)\
+        .options(selectinload(models.Purchase.purchase_installments))\
+        .where(models.Purchase.id.in_(purchase_ids))
+
+def _purchase_page(page_rows, loaded, total: Optional[int], page: int, page_size: int, columns) -> dict:
+    purchases_by_id = {purchase.id: purchase for purchase in loaded}
+    return {
+        "items": [purchases_by_id[row.id] for row in page_rows],
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "next_cursor": next_cursor(page_rows, page_size, columns)
+    }
+
 def get_purchases_with_installments(
     db: Session,
     user_id: Optional[int] = None,
     page: int = 1,
     page_size: int = 10,
-    status: Optional[str] = None
-) -> List[models.Purchase]:
-    query = db.query(models.Purchase)\
-        .options(joinedload(models.Purchase.purchase_installments))
-    
-    # Apply user_id filter only if provided
-    if user_id is not None:
-        query = query.filter(models.Purchase.user_id == user_id)
-    
-    if status:
-        query = query.filter(models.Purchase.status == status)
-    
-    # Calculate offset
-    offset = (page - 1) * page_size
-    
-    # Get total count
-    total = query.count()
-    
-    # Get paginated results
-    purchases = query.order_by(models.Purchase.created_at.desc())\
-        .offset(offset)\
-        .limit(page_size)\
-        .all()
-    
-    return purchases
+    status: Optional[str] = None,
+    after: Optional[str] = None,
+    include_total: bool = True
+) -> dict:
+    count, page_stmt, columns = _purchase_ids_statements(user_id, page, page_size, status, after)
+    total = db.scalar(count) if include_total else None
+    page_rows = db.execute(page_stmt).all()
+
+    loaded = []
+    if page_rows:
+        loaded = db.scalars(_purchases_select([row.id for row in page_rows])).all()
+    return _purchase_page(page_rows, loaded, total, page, page_size, columns)
+
+async def get_purchases_with_installments_async(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    page: int = 1,
+    page_size: int = 10,
+    status: Optional[str] = None,
+    after: Optional[str] = None,
+    include_total: bool = True
+) -> dict:
+    count, page_stmt, columns = _purchase_ids_statements(user_id, page, page_size, status, after)
+    total = await db.scalar(count) if include_total else None
+    page_rows = (await db.execute(page_stmt)).all()
+
+    loaded = []
+    if page_rows:
+        loaded = (await db.scalars(_purchases_select([row.id for row in page_rows]))).all()
+    return _purchase_page(page_rows, loaded, total, page, page_size, columns)
@@ -1,54 +1,67 @@
 from sqlalchemy.orm import Session
 from app.db import models
-from datetime import datetime, timedelta
-from app.api.schemas.reports import ReportRequest, ReportResponse
+from datetime import date, timedelta
+from app.api.schemas.reports import ReportRequest, ReportResponse, ReportBucket
 from sqlalchemy import func
+from typing import Dict, List, Tuple
 
-def generate_report(db: Session, report_request: ReportRequest):
-    start_date = report_request.start_date
-    end_date = report_request.end_date
-
-    weekly_paid_amount = 0
-    weekly_due_amount = 0
-    monthly_paid_amount = 0
-    monthly_due_amount = 0 
+def _get_daily_totals(db: Session, start_date: date, end_date: date) -> Dict[date, Tuple[float, float]]:
+    """Sum paid and due amounts per purchase day from the daily rollup"""
+    rows = db.query(
+        models.DailyRollup.day,
+        func.sum(models.DailyRollup.paid_amount).label("paid_amount"),
+        func.sum(models.DailyRollup.due_amount).label("due_amount")
+    ).filter(
+        models.DailyRollup.day >= start_date,
+        models.DailyRollup.day < end_date
+    ).group_by(models.DailyRollup.day).all()
 
-    weekly_start = start_date
-    while weekly_start < end_date:
-        weekly_end = min(weekly_start + timedelta(days=7), end_date)
-        weekly_paid_amount += db.query(models.Purchase).filter(
-            models.Purchase.created_at >= weekly_start,
-            models.Purchase.created_at < weekly_end
-        ).with_entities(func.sum(models.Purchase.paid_amount)).scalar() or 0
+    return {
+        row.day: (float(row.paid_amount or 0), float(row.due_amount or 0))
+        for row in rows
+    }
 
-        weekly_due_amount += db.query(models.Purchase).filter(
-            models.Purchase.created_at >= weekly_start,
-            models.Purchase.created_at < weekly_end
-        ).with_entities(func.sum(models.Purchase.due_amount)).scalar() or 0
+def _build_buckets(
+    daily_totals: Dict[date, Tuple[float, float]],
+    start_date: date,
+    end_date: date,
+    bucket_days: int
+) -> List[ReportBucket]:
+    """Fold daily totals into consecutive windows of bucket_days starting at start_date"""
+    buckets = []
+    bucket_start = start_date
+    while bucket_start < end_date:
+        bucket_end = min(bucket_start + timedelta(days=bucket_days), end_date)
+        buckets.append(ReportBucket(
+            start_date=bucket_start,
+            end_date=bucket_end,
+            paid_amount=0,
+            due_amount=0
+        ))
+        bucket_start = bucket_end
 
-        weekly_start = weekly_end
+    for day, (paid_amount, due_amount) in daily_totals.items():
+        bucket = buckets[(day - start_date).days // bucket_days]
+        bucket.paid_amount += paid_amount
+        bucket.due_amount += due_amount
 
-    monthly_start = start_date
-    while monthly_start < end_date:
-        monthly_end = min(monthly_start + timedelta(days=30), end_date)
+    return buckets
 
-        monthly_paid_amount += db.query(models.Purchase).filter(
-            models.Purchase.created_at >= monthly_start,
-            models.Purchase.created_at < monthly_end
-        ).with_entities(func.sum(models.Purchase.paid_amount)).scalar() or 0
-
-        monthly_due_amount += db.query(models.Purchase).filter(
-            models.Purchase.created_at >= monthly_start,
-            models.Purchase.created_at < monthly_end
-        ).with_entities(func.sum(models.Purchase.due_amount)).scalar() or 0
+def generate_report(db: Session, report_request: ReportRequest):
+    start_date = report_request.start_date
+    end_date = report_request.end_date
 
-        monthly_start = monthly_end
+    daily_totals = _get_daily_totals(db, start_date, end_date)
+    weekly = _build_buckets(daily_totals, start_date, end_date, 7)
+    monthly = _build_buckets(daily_totals, start_date, end_date, 30)
 
     report_response = ReportResponse(
-        weekly_paid_amount=weekly_paid_amount,
-        weekly_due_amount=weekly_due_amount,
-        monthly_paid_amount=monthly_paid_amount,
-        monthly_due_amount=monthly_due_amount,
+        weekly_paid_amount=sum(bucket.paid_amount for bucket in weekly),
+        weekly_due_amount=sum(bucket.due_amount for bucket in weekly),
+        monthly_paid_amount=sum(bucket.paid_amount for bucket in monthly),
+        monthly_due_amount=sum(bucket.due_amount for bucket in monthly),
+        weekly=weekly,
+        monthly=monthly,
     )
 
     return report_response
@@ -0,0 +1,193 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, delete, insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.db import models
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+
+ROLLUP_COUNTERS = (
+    "purchase_count",
+    "paid_amount",
+    "due_amount",
+    "installment_count",
+    "installment_amount",
+)
+
+def _upsert(db: Session, rows: List[dict]) -> None:
+    """Add each row's counters to the rollup row for its (day, category, status), creating it if needed"""
+    # Merge rows for the same bucket; one batched upsert may not touch a row twice on Postgres
+    merged = {}
+    for row in rows:
+        key = (row["day"], row["category_id"], row["status"])
+        if key in merged:
+            for counter in ROLLUP_COUNTERS:
+                merged[key][counter] += row[counter]
+        else:
+            merged[key] = dict(row)
+    rows = [row for row in merged.values() if any(row[counter] for counter in ROLLUP_COUNTERS)]
+    if not rows:
+        return
+
+    if db.get_bind().dialect.name == "postgresql":
+        stmt = postgresql_insert(models.DailyRollup)
+    else:
+        stmt = sqlite_insert(models.DailyRollup)
+
+    table = models.DailyRollup.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "category_id", "status"],
+        set_={counter: table.c[counter] + stmt.excluded[counter] for counter in ROLLUP_COUNTERS}
+    )
+    # A single executemany however many rows there are
+    db.execute(stmt, rows)
+
+def _rollup_row(day: date, category_id: int, status: str, **deltas) -> dict:
+    return {
+        "day": day,
+        "category_id": category_id,
+        "status": status,
+        **{counter: deltas.get(counter, 0) for counter in ROLLUP_COUNTERS}
+    }
+
+def record_purchase(
+    db: Session,
+    purchase: models.Purchase,
+    category_id: int,
+    installments: Iterable[dict]
+) -> None:
+    """Add a newly created purchase and its installment rows to the rollup"""
+    day = purchase.created_at.date()
+    rows = [_rollup_row(
+        day, category_id, purchase.status,
+        purchase_count=1,
+        paid_amount=purchase.paid_amount,
+        due_amount=purchase.due_amount
+    )]
+    for installment in installments:
+        rows.append(_rollup_row(
+            day, category_id, installment["status"],
+            installment_count=1,
+            installment_amount=installment["amount"]
+        ))
+    _upsert(db, rows)
+
+def record_new_purchases(
+    db: Session,
+    day: date,
+    by_category: Dict[int, Tuple[int, float, int]]
+) -> None:
+    """Add unpaid purchases and their installments to the rollup.
+
+    by_category maps category id to (purchase count, amount, installment count).
+    """
+    pending = models.PaymentStatusEnum.pending.value
+    _upsert(db, [
+        _rollup_row(
+            day, category_id, pending,
+            purchase_count=purchase_count,
+            due_amount=amount,
+            installment_count=installment_count,
+            installment_amount=amount
+        )
+        for category_id, (purchase_count, amount, installment_count) in by_category.items()
+    ])
+
+def move_installments(
+    db: Session,
+    day: date,
+    category_id: int,
+    old_status: str,
+    new_status: str,
+    count: int,
+    amount: float
+) -> None:
+    """Move installments of a purchase day from one status bucket to another"""
+    if old_status == new_status:
+        return
+    _upsert(db, [
+        _rollup_row(day, category_id, old_status, installment_count=-count, installment_amount=-amount),
+        _rollup_row(day, category_id, new_status, installment_count=count, installment_amount=amount)
+    ])
+
+def move_purchase(
+    db: Session,
+    day: date,
+    category_id: int,
+    old: Tuple[str, float, float],
+    new: Tuple[str, float, float]
+) -> None:
+    """Replace a purchase's (status, paid_amount, due_amount) contribution to the rollup"""
+    old_status, old_paid, old_due = old
+    new_status, new_paid, new_due = new
+
+    _upsert(db, [
+        _rollup_row(day, category_id, old_status, purchase_count=-1, paid_amount=-old_paid, due_amount=-old_due),
+        _rollup_row(day, category_id, new_status, purchase_count=1, paid_amount=new_paid, due_amount=new_due)
+    ])
+
+def _to_date(value) -> date:
+    # SQLite returns DATE() as a string, Postgres as a date
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+def rebuild_rollups(db: Session) -> int:
+    """Recompute the whole rollup table from purchases and installments"""
+    purchase_day = func.date(models.Purchase.created_at)
+
+    purchase_rows = db.query(
+        purchase_day.label("day"),
+        models.Product.category_id,
+        models.Purchase.status,
+        func.count(models.Purchase.id),
+        func.sum(models.Purchase.paid_amount),
+        func.sum(models.Purchase.due_amount)
+    ).join(
+        models.Product,
+        models.Purchase.product_id == models.Product.id
+    ).group_by(purchase_day, models.Product.category_id, models.Purchase.status).all()
+
+    installment_rows = db.query(
+        purchase_day.label("day"),
+        models.Product.category_id,
+        models.Installment.status,
+        func.count(models.Installment.id),
+        func.sum(models.Installment.amount)
+    ).join(
+        models.Purchase,
+        models.Installment.purchase_id == models.Purchase.id
+    ).join(
+        models.Product,
+        models.Purchase.product_id == models.Product.id
+    ).group_by(purchase_day, models.Product.category_id, models.Installment.status).all()
+
+    rollups = {}
+    def get_row(day, category_id, row_status):
+        key = (_to_date(day), category_id, row_status)
+        if key not in rollups:
+            rollups[key] = {counter: 0 for counter in ROLLUP_COUNTERS}
+        return rollups[key]
+
+    for day, category_id, row_status, count, paid_amount, due_amount in purchase_rows:
+        row = get_row(day, category_id, row_status)
+        row["purchase_count"] = count
+        row["paid_amount"] = float(paid_amount or 0)
+        row["due_amount"] = float(due_amount or 0)
+
+    for day, category_id, row_status, count, amount in installment_rows:
+        row = get_row(day, category_id, row_status)
+        row["installment_count"] = count
+        row["installment_amount"] = float(amount or 0)
+
+    try:
+        db.execute(delete(models.DailyRollup))
+        if rollups:
+            db.execute(insert(models.DailyRollup), [
+                {"day": day, "category_id": category_id, "status": row_status, **counters}
+                for (day, category_id, row_status), counters in rollups.items()
+            ])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(rollups)
@@ -12,54 +12,43 @@ def get_admin_dashboard_stats(db: Session, current_user: models.User) -> Dict[st
             detail="Only admin users can access these statistics"
         )
 
-    # Get total counts
-    total_purchases = db.query(models.Purchase).count()
-    total_installments = db.query(models.Installment).count()
     total_products = db.query(models.Product).count()
 
-    # Get installment counts by status
-    installment_stats = db.query(
-        models.Installment.status,
-        func.count(models.Installment.id).label('count')
-    ).group_by(models.Installment.status).all()
+    # Purchase and installment figures come from the daily rollup
+    rollup_rows = db.query(
+        models.DailyRollup.status,
+        func.sum(models.DailyRollup.purchase_count).label('purchase_count'),
+        func.sum(models.DailyRollup.installment_count).label('installment_count'),
+        func.sum(models.DailyRollup.installment_amount).label('installment_amount')
+    ).group_by(models.DailyRollup.status).all()
 
-    paid_count = 0
-    pending_count = 0
-    overdue_count = 0
+    total_purchases = 0
+    total_installments = 0
+    counts = {}
+    amounts = {}
 
-    for status, count in installment_stats:
-        if status == models.PaymentStatusEnum.paid.value:
-            paid_count = count
-        elif status == models.PaymentStatusEnum.pending.value:
-            pending_count = count
-        elif status == models.PaymentStatusEnum.overdue.value:
-            overdue_count = count
+    for row in rollup_rows:
+        total_purchases += row.purchase_count or 0
+        total_installments += row.installment_count or 0
+        counts[row.status] = row.installment_count or 0
+        amounts[row.status] = row.installment_amount or 0
 
-    # Get income statistics
-    income_stats = db.query(
-        func.sum(models.Installment.amount).filter(
-            models.Installment.status == models.PaymentStatusEnum.paid.value
-        ).label('paid_amount'),
-        func.sum(models.Installment.amount).filter(
-            models.Installment.status == models.PaymentStatusEnum.pending.value
-        ).label('pending_amount'),
-        func.sum(models.Installment.amount).filter(
-            models.Installment.status == models.PaymentStatusEnum.overdue.value
-        ).label('overdue_amount')
-    ).first()
+    paid = models.PaymentStatusEnum.paid.value
+    pending = models.PaymentStatusEnum.pending.value
+    overdue = models.PaymentStatusEnum.overdue.value
 
     return {
         "total_purchases": total_purchases,
         "total_installments": total_installments,
         "total_products": total_products,
         "installments_stats": {
-            "paid_count": paid_count,
-            "pending_count": pending_count,
-            "overdue_count": overdue_count
+            "paid_count": counts.get(paid, 0),
+            "pending_count": counts.get(pending, 0),
+            "overdue_count": counts.get(overdue, 0)
         },
         "income_stats": {
-            "total_paid_amount": float(income_stats.paid_amount or 0),
-            "total_pending_amount": float(income_stats.pending_amount or 0),
-            "total_overdue_amount": float(income_stats.overdue_amount or 0)
+            "total_paid_amount": float(amounts.get(paid, 0)),
+            "total_pending_amount": float(amounts.get(pending, 0)),
+            "total_overdue_amount": float(amounts.get(overdue, 0))
         }
     }
\ No newline at end of file
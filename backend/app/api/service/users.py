@@ -7,6 +7,11 @@ from app.db import models
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from typing import Optional
+from app.core.pagination import keyset_columns, apply_keyset, next_cursor
+from app.core.cache import user_cache
+
+# Sort keys that are never null and therefore usable as a pagination cursor
+CURSOR_SORT_COLUMNS = ("id", "name", "email", "created_at")
 
 def get_current_user(db: Session, email: str) -> UserResponse:
     user = db.query(models.User).filter(models.User.email == email).first()
@@ -25,6 +30,8 @@ def get_customers(
     sort_order: str = "asc",
     name: Optional[str] = None,
     role: Optional[str] = None,
+    after: Optional[str] = None,
+    include_total: bool = True
 ):
     query = db.query(models.User)
 
@@ -35,20 +42,24 @@ def get_customers(
     if role:
         query = query.filter(models.User.role == role)
 
-    # Apply sorting
-    if sort_order == "asc":
-        order = asc(getattr(models.User, sort_by))
-    else:
-        order = desc(getattr(models.User, sort_by))
+    if after and sort_by not in CURSOR_SORT_COLUMNS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor pagination is only supported when sorting by {', '.join(CURSOR_SORT_COLUMNS)}"
+        )
+
+    total = query.count() if include_total else None
 
-    query = query.order_by(order)
+    # Apply sorting
+    columns = keyset_columns(getattr(models.User, sort_by), models.User.id)
+    query = apply_keyset(query, columns, descending=sort_order != "asc", after=after)
 
     # Apply pagination
-    total = query.count()
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    customers = query.all()
+    if not after:
+        query = query.offset((page - 1) * page_size)
+    customers = query.limit(page_size).all()
 
-    return customers
+    return customers, total, next_cursor(customers, page_size, columns)
 
 def delete_user(db: Session, user_id: int) -> None:
     user = db.query(models.User).filter(models.User.id == user_id).first()
@@ -80,6 +91,7 @@ def delete_user(db: Session, user_id: int) -> None:
     
     try:
         db.commit()
+        user_cache.delete(user.email)
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -0,0 +1,42 @@
+import argparse
+from sqlalchemy.orm import Session
+from app.db.session import engine
+from app.db.migrations import upgrade_database
+from app.core.init_data import initialize_data
+from app.api.service.rollups import rebuild_rollups
+
+def migrate_command(args: argparse.Namespace) -> None:
+    """Bring the database schema up to date"""
+    upgrade_database(revision=args.revision)
+
+def seed_command(args: argparse.Namespace) -> None:
+    """Create the default users, categories and products"""
+    with Session(engine) as db:
+        initialize_data(db)
+    print("Seeded default data")
+
+def rebuild_rollups_command(args: argparse.Namespace) -> None:
+    """Recompute the daily rollup table from purchases and installments"""
+    with Session(engine) as db:
+        rows = rebuild_rollups(db)
+    print(f"Rebuilt daily rollups: {rows} rows")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Installment Tracker maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Apply database migrations")
+    migrate_parser.add_argument("revision", nargs="?", default="head", help="Target revision (default: head)")
+    migrate_parser.set_defaults(handler=migrate_command)
+
+    seed_parser = subparsers.add_parser("seed", help="Create the default data")
+    seed_parser.set_defaults(handler=seed_command)
+
+    rebuild_parser = subparsers.add_parser("rebuild-rollups", help="Recompute the daily rollup table")
+    rebuild_parser.set_defaults(handler=rebuild_rollups_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,42 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Settings:
-    EMAIL_HOST = "smtp.gmail.com"
-    EMAIL_PORT = 587
+    EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
+    EMAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
+    EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "true").lower() == "true"
     EMAIL_USER = os.getenv("EMAIL_USER")
     EMAIL_PASS = os.getenv("EMAIL_PASS")
+    EMAIL_POLL_INTERVAL = float(os.getenv("EMAIL_POLL_INTERVAL", "2"))
+    EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BACKOFF = int(os.getenv("EMAIL_RETRY_BACKOFF", "30"))
+    EMAIL_SEND_LEASE = int(os.getenv("EMAIL_SEND_LEASE", "300"))
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Postgres only; 0 disables
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
     SECRET_KEY = os.getenv("SECRET_KEY", "default-secret-key")
     ALGORITHM = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES = 100
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+    USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+    INSTALLMENT_STATS_CACHE_TTL = int(os.getenv("INSTALLMENT_STATS_CACHE_TTL", "30"))
+    CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", "300"))
+    CATALOG_CACHE_MAX_SIZE = int(os.getenv("CATALOG_CACHE_MAX_SIZE", "512"))
+    OVERDUE_SWEEP_INTERVAL = int(os.getenv("OVERDUE_SWEEP_INTERVAL", "300"))
+    OVERDUE_SWEEP_BATCH_SIZE = int(os.getenv("OVERDUE_SWEEP_BATCH_SIZE", "500"))
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    # Per-request SQL tracing; can also be switched at runtime through /metrics/query-log
+    QUERY_LOG_ENABLED = os.getenv("QUERY_LOG_ENABLED", "false").lower() == "true"
+    QUERY_LOG_SAMPLE_RATE = float(os.getenv("QUERY_LOG_SAMPLE_RATE", "1.0"))
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
 
 settings = Settings()
@@ -1,15 +1,129 @@
+import logging
 import smtplib
+from datetime import datetime, timedelta
 from email.mime.text import MIMEText
+from typing import Optional
+from sqlalchemy import select, update, or_
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.db import models
 
-def send_email(to_email: str, subject: str, body: str):
-    print("Sending email to:", to_email)
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = settings.EMAIL_USER
-    msg["To"] = to_email
-
-    with smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT) as server:
-        server.starttls()
-        server.login(settings.EMAIL_USER, settings.EMAIL_PASS)
-        server.sendmail(settings.EMAIL_USER, to_email, msg.as_string())
+logger = logging.getLogger(__name__)
+
+def queue_email(db: Session, to_email: str, subject: str, body: str) -> models.EmailOutbox:
+    """Add a message to the outbox; it is sent once the caller commits"""
+    message = models.EmailOutbox(to_email=to_email, subject=subject, body=body)
+    db.add(message)
+    return message
+
+class SMTPMailer:
+    """One SMTP session reused across messages, reconnecting when the server drops it"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None):
+        self.host = host or settings.EMAIL_HOST
+        self.port = port or settings.EMAIL_PORT
+        self._server: Optional[smtplib.SMTP] = None
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if settings.EMAIL_USE_TLS:
+            server.starttls()
+        if settings.EMAIL_USER and settings.EMAIL_PASS:
+            server.login(settings.EMAIL_USER, settings.EMAIL_PASS)
+        return server
+
+    def send(self, to_email: str, subject: str, body: str) -> None:
+        msg = MIMEText(body)
+        msg["Subject"] = subject
+        msg["From"] = settings.EMAIL_USER
+        msg["To"] = to_email
+
+        for attempt in range(2):
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.sendmail(settings.EMAIL_USER, to_email, msg.as_string())
+                return
+            except smtplib.SMTPServerDisconnected:
+                # Idle sessions get dropped by the server; reconnect once
+                self._server = None
+                if attempt:
+                    raise
+
+    def close(self) -> None:
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except smtplib.SMTPException:
+                pass
+            self._server = None
+
+def deliver_pending_emails(db: Session, mailer: SMTPMailer, batch_size: int = 50) -> int:
+    """Claim a batch of due outbox messages, send them over mailer and record the outcome.
+
+    Returns the number of messages claimed.
+    """
+    now = datetime.utcnow()
+    claimable = select(models.EmailOutbox.id).where(
+        or_(
+            models.EmailOutbox.status == models.EmailStatusEnum.pending.value,
+            # A sender that died mid-batch leaves its lease to expire
+            models.EmailOutbox.status == models.EmailStatusEnum.sending.value
+        ),
+        models.EmailOutbox.next_attempt_at <= now
+    ).order_by(models.EmailOutbox.id).limit(batch_size).scalar_subquery()
+
+    claimed = db.execute(
+        update(models.EmailOutbox)
+        .where(
+            models.EmailOutbox.id.in_(claimable),
+            models.EmailOutbox.next_attempt_at <= now
+        )
+        .values(
+            status=models.EmailStatusEnum.sending.value,
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_SEND_LEASE)
+        )
+        .returning(
+            models.EmailOutbox.id,
+            models.EmailOutbox.to_email,
+            models.EmailOutbox.subject,
+            models.EmailOutbox.body,
+            models.EmailOutbox.attempts
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+
+    for message in claimed:
+        attempts = message.attempts + 1
+        try:
+            mailer.send(message.to_email, message.subject, message.body)
+            values = {
+                "status": models.EmailStatusEnum.sent.value,
+                "attempts": attempts,
+                "sent_at": datetime.utcnow(),
+                "last_error": None
+            }
+        except Exception as e:
+            logger.warning("Failed to send email %s to %s: %s", message.id, message.to_email, e)
+            mailer.close()
+            if attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                values = {"status": models.EmailStatusEnum.failed.value}
+            else:
+                values = {
+                    "status": models.EmailStatusEnum.pending.value,
+                    "next_attempt_at": datetime.utcnow() + timedelta(
+                        seconds=settings.EMAIL_RETRY_BACKOFF * 2 ** (attempts - 1)
+                    )
+                }
+            values.update(attempts=attempts, last_error=str(e)[:500])
+
+        db.execute(
+            update(models.EmailOutbox)
+            .where(models.EmailOutbox.id == message.id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    return len(claimed)
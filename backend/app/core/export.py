@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterator, Literal
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+ExportFormat = Literal["csv", "ndjson"]
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _csv_lines(keys, partition) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if keys is not None:
+        writer.writerow(keys)
+    writer.writerows(partition)
+    return buffer.getvalue()
+
+def stream_export(stmt, export_format: str) -> Iterator[bytes]:
+    """Run a column select and yield its rows as CSV or NDJSON, one chunk per batch.
+
+    Opens its own session, since the request's session is closed before a
+    streamed body is sent. yield_per streams from a server-side cursor where
+    the driver has one, so memory stays flat whatever the row count.
+    """
+    with SessionLocal() as db:
+        result = db.execute(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        keys = list(result.keys())
+
+        if export_format == "csv":
+            header = keys
+            for partition in result.partitions():
+                yield _csv_lines(header, partition).encode()
+                header = None
+            if header is not None:
+                # No rows: still send the header
+                yield _csv_lines(header, []).encode()
+            return
+
+        for partition in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(keys, row)), default=_json_default, separators=(",", ":")) + "\n"
+                for row in partition
+            ).encode()
+
+def export_response(stmt, export_format: str, name: str) -> StreamingResponse:
+    """Stream a select as a downloadable CSV or NDJSON attachment"""
+    return StreamingResponse(
+        stream_export(stmt, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
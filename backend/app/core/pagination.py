@@ -0,0 +1,79 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import asc, desc, func, select, tuple_
+
+def keyset_columns(sort_column, id_column) -> list:
+    """Sort key plus id tiebreaker, so every row has a unique position"""
+    if sort_column is id_column:
+        return [id_column]
+    return [sort_column, id_column]
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str, columns: Sequence) -> List[Any]:
+    try:
+        payload = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(payload)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+
+        decoded = []
+        for column, value in zip(columns, values):
+            if value is None:
+                raise ValueError("cursor contains a null sort value")
+            python_type = column.type.python_type
+            if python_type is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif not isinstance(value, python_type):
+                decoded.append(python_type(value))
+            else:
+                decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def apply_keyset(query, columns: Sequence, descending: bool, after: Optional[str] = None):
+    """Order query by columns and, when after is given, continue right past that cursor"""
+    if after:
+        values = decode_cursor(after, columns)
+        if len(columns) == 1:
+            key, bound = columns[0], values[0]
+        else:
+            key, bound = tuple_(*columns), tuple_(*values)
+        query = query.filter(key < bound if descending else key > bound)
+
+    direction = desc if descending else asc
+    return query.order_by(*[direction(column) for column in columns])
+
+def next_cursor(items: Sequence, limit: int, columns: Sequence) -> Optional[str]:
+    """Cursor pointing after the last item, or None when the page was not full"""
+    if not items or len(items) < limit:
+        return None
+    values = [getattr(items[-1], column.key) for column in columns]
+    # Rows with a null sort key cannot be resumed from
+    if any(value is None for value in values):
+        return None
+    return encode_cursor(values)
+
+def count_select(stmt):
+    """SELECT count(*) over the rows of stmt"""
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+def page_select(stmt, columns: Sequence, descending: bool, after: Optional[str], offset: int, limit: int):
+    """Keyset-ordered page of stmt: continue after the cursor if given, else skip offset rows"""
+    stmt = apply_keyset(stmt, columns, descending=descending, after=after)
+    if not after:
+        stmt = stmt.offset(offset)
+    return stmt.limit(limit)
@@ -0,0 +1,173 @@
+import logging
+import os
+import random
+import re
+import sys
+import threading
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.core.config import settings
+
+try:
+    import greenlet
+except ImportError:  # only needed to see past AsyncSession's greenlet boundary
+    greenlet = None
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_OWN_FILES = {os.path.abspath(__file__), os.path.join(APP_ROOT, "core", "metrics.py")}
+
+# Statements kept per request; shapes are still counted past this
+MAX_STATEMENTS_PER_REQUEST = 500
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAMETER_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|%s|:\w+|\$\d+))*\s*\)")
+
+# Relationship whose lazy load is about to run a statement in this context
+_lazy_load: ContextVar[Optional[str]] = ContextVar("lazy_load", default=None)
+
+# Most recent requests that had slow or repeated statements, newest last
+query_reports = deque(maxlen=100)
+
+class QueryLogConfig:
+    """Query log switches, read on every request so they can be changed while running"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = settings.QUERY_LOG_ENABLED
+        self.sample_rate = settings.QUERY_LOG_SAMPLE_RATE
+        self.slow_query_ms = settings.SLOW_QUERY_MS
+        self.repeat_threshold = settings.N_PLUS_ONE_THRESHOLD
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_query_ms": self.slow_query_ms,
+            "repeat_threshold": self.repeat_threshold
+        }
+
+    def update(self, **changes) -> dict:
+        with self._lock:
+            for name, value in changes.items():
+                if value is not None:
+                    setattr(self, name, value)
+            return self.as_dict()
+
+query_log_config = QueryLogConfig()
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace and bound-parameter lists collapsed"""
+    return _PARAMETER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+def _app_frame(frame) -> Optional[str]:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_ROOT) and filename not in _OWN_FILES:
+            return f"{os.path.relpath(filename, os.path.dirname(APP_ROOT))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+def call_site() -> str:
+    """Innermost application frame that led to the statement being executed"""
+    site = _app_frame(sys._getframe(1))
+    if site is None and greenlet is not None:
+        # AsyncSession runs the ORM in a child greenlet; the caller waits in the parent
+        parent = greenlet.getcurrent().parent
+        if parent is not None:
+            site = _app_frame(parent.gr_frame)
+    # Lazy loads during response serialization have no application frame on the stack
+    return site or "outside application code"
+
+def note_lazy_load(orm_execute_state) -> None:
+    """Session do_orm_execute hook remembering which relationship a lazy load is for"""
+    if query_log_config.enabled and orm_execute_state.lazy_loaded_from is not None:
+        _lazy_load.set(str(orm_execute_state.loader_strategy_path[-1]))
+
+class QueryTrace:
+    """Every statement executed while serving one request"""
+    __slots__ = ("statements", "shapes", "slow_query_ms")
+
+    def __init__(self, slow_query_ms: float):
+        self.statements: List[dict] = []
+        # shape -> [count, total seconds, call sites]
+        self.shapes: Dict[str, list] = {}
+        self.slow_query_ms = slow_query_ms
+
+    def record(self, statement: str, elapsed: float) -> None:
+        site = call_site()
+        lazy_load = _lazy_load.get()
+        if lazy_load is not None:
+            _lazy_load.set(None)
+            site = f"{site}, lazy load of {lazy_load}"
+        shape = statement_shape(statement)
+        entry = self.shapes.setdefault(shape, [0, 0.0, []])
+        entry[0] += 1
+        entry[1] += elapsed
+        if site not in entry[2]:
+            entry[2].append(site)
+
+        if len(self.statements) < MAX_STATEMENTS_PER_REQUEST:
+            self.statements.append({
+                "statement": shape,
+                "duration_ms": round(elapsed * 1000, 3),
+                "call_site": site
+            })
+
+    def slow(self) -> List[dict]:
+        return [item for item in self.statements if item["duration_ms"] >= self.slow_query_ms]
+
+    def repeated(self, threshold: int) -> List[dict]:
+        return [
+            {
+                "statement": shape,
+                "count": count,
+                "total_ms": round(total * 1000, 3),
+                "call_sites": sites
+            }
+            for shape, (count, total, sites) in self.shapes.items()
+            if count >= threshold
+        ]
+
+def start_trace() -> Optional[QueryTrace]:
+    """A trace for the incoming request if the query log is on and it is sampled"""
+    config = query_log_config
+    if not config.enabled or random.random() >= config.sample_rate:
+        return None
+    return QueryTrace(config.slow_query_ms)
+
+def finish_trace(trace: QueryTrace, method: str, route: str, status_code: int) -> Optional[dict]:
+    """Log and keep a report of the request's slow and repeated statements, if any"""
+    for item in trace.statements:
+        logger.debug("%s %s [%.1f ms] %s (%s)", method, route, item["duration_ms"], item["statement"], item["call_site"])
+
+    slow = trace.slow()
+    repeated = trace.repeated(query_log_config.repeat_threshold)
+    if not slow and not repeated:
+        return None
+
+    for item in slow:
+        logger.warning(
+            "Slow query on %s %s: %.1f ms at %s: %s",
+            method, route, item["duration_ms"], item["call_site"], item["statement"]
+        )
+    for item in repeated:
+        logger.warning(
+            "Possible N+1 on %s %s: %s identical statements from %s: %s",
+            method, route, item["count"], ", ".join(item["call_sites"]), item["statement"]
+        )
+
+    report = {
+        "at": datetime.utcnow(),
+        "method": method,
+        "route": route,
+        "status": status_code,
+        "queries": sum(count for count, _, _ in trace.shapes.values()),
+        "slow": slow,
+        "repeated": repeated
+    }
+    query_reports.append(report)
+    return report
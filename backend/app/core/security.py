@@ -1,25 +1,28 @@
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
 from fastapi import status
 from app.core.config import settings
 from app.api.service.users import get_current_user
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from app.db.session import get_db
 from app.db import models
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.cache import user_cache
+from app.core.hashing import (
+    pwd_context,
+    get_password_hash,
+    verify_password,
+    password_needs_rehash,
+    hash_password_async,
+    verify_password_async
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login-form")
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 def create_access_token(subject: str) -> str:
     expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     expire = datetime.utcnow() + expires_delta
@@ -35,6 +38,31 @@ def create_access_token(subject: str) -> str:
         algorithm=settings.ALGORITHM
     )
 
+# Never cached: kept out of process memory, and changed by OTP and password flows
+# that do not evict. Handlers reading them on a cached user load them on access.
+UNCACHED_USER_COLUMNS = frozenset(("hashed_password", "otp", "otp_expiry"))
+
+def _get_user_by_email(db: Session, email: str):
+    user = db.query(models.User).filter(models.User.email == email).first()
+    if user is not None:
+        user_cache.set(email, {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(models.User).column_attrs
+            if attr.key not in UNCACHED_USER_COLUMNS
+        })
+    return user
+
+def _attach_cached_user(db: Session, values: dict) -> models.User:
+    """Rebuild a cached user as a detached instance and attach it without a query.
+
+    Columns missing from the cache are loaded from the database if accessed.
+    """
+    user = models.User()
+    for key, value in values.items():
+        set_committed_value(user, key, value)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
 async def get_current_active_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
@@ -44,7 +72,11 @@ async def get_current_active_user(token: str = Depends(oauth2_scheme), db: Sessi
     except:
         raise HTTPException(status_code=400, detail="Invalid credentials")
     
-    user = db.query(models.User).filter(models.User.email == email).first()
+    cached = user_cache.get(email)
+    if cached is not None:
+        return _attach_cached_user(db, cached)
+
+    user = await run_in_threadpool(_get_user_by_email, db, email)
     if user is None:
         raise HTTPException(status_code=400, detail="User not found")
     return user
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.api.service.installments import mark_overdue_installments
+from app.core.email_utils import SMTPMailer, deliver_pending_emails
+from app.api.service.notifications import process_notification_job
+
+logger = logging.getLogger(__name__)
+
+# Most recent overdue sweeps, newest last
+sweep_history = deque(maxlen=50)
+
+def run_overdue_sweep() -> dict:
+    """Run one overdue sweep in its own session and record what it touched"""
+    started_at = datetime.utcnow()
+    with SessionLocal() as db:
+        touched = mark_overdue_installments(db, batch_size=settings.OVERDUE_SWEEP_BATCH_SIZE)
+
+    record = {
+        "started_at": started_at,
+        "finished_at": datetime.utcnow(),
+        **touched
+    }
+    sweep_history.append(record)
+    logger.info(
+        "Overdue sweep marked %s installments and %s purchases in %s batches",
+        touched["installments"], touched["purchases"], touched["batches"]
+    )
+    return record
+
+async def overdue_sweeper(interval: int) -> None:
+    """Run the overdue sweep every interval seconds off the event loop"""
+    while True:
+        try:
+            await asyncio.to_thread(run_overdue_sweep)
+        except Exception:
+            logger.exception("Overdue sweep failed")
+        await asyncio.sleep(interval)
+
+def run_notification_job(job_id: int) -> None:
+    """Process a bulk notification job in its own session"""
+    with SessionLocal() as db:
+        process_notification_job(db, job_id)
+
+def run_email_delivery(mailer: SMTPMailer) -> int:
+    """Send one batch of queued emails in its own session"""
+    with SessionLocal() as db:
+        return deliver_pending_emails(db, mailer, batch_size=settings.EMAIL_BATCH_SIZE)
+
+async def email_worker(interval: float) -> None:
+    """Drain the email outbox over a single reused SMTP session"""
+    mailer = SMTPMailer()
+    try:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(run_email_delivery, mailer)
+            except Exception:
+                logger.exception("Email delivery failed")
+                claimed = 0
+            # Keep draining while batches come back full
+            if claimed < settings.EMAIL_BATCH_SIZE:
+                await asyncio.sleep(interval)
+    finally:
+        await asyncio.to_thread(mailer.close)
@@ -0,0 +1,31 @@
+import os
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from app.db.session import SQLALCHEMY_DATABASE_URL, create_db_engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The revision matching the schema create_all produced before migrations existed
+BASELINE_REVISION = "0001"
+
+def alembic_config(url: str = SQLALCHEMY_DATABASE_URL) -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    # Config values go through ConfigParser interpolation; keep percent-encoded passwords intact
+    config.set_main_option("sqlalchemy.url", url.replace("%", "%%"))
+    return config
+
+def upgrade_database(url: str = SQLALCHEMY_DATABASE_URL, revision: str = "head") -> None:
+    """Migrate the database to revision, adopting databases that predate migrations"""
+    config = alembic_config(url)
+    engine = create_db_engine(url)
+    try:
+        tables = set(inspect(engine).get_table_names())
+        if "users" in tables and "alembic_version" not in tables:
+            # Built by create_all: the baseline tables exist, later revisions create the rest
+            command.stamp(config, BASELINE_REVISION)
+    finally:
+        engine.dispose()
+
+    command.upgrade(config, revision)
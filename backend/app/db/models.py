@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Enum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, DateTime, Boolean, Enum, UniqueConstraint, Index
+from sqlalchemy import event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum as PyEnum
 from .base import Base
+from .search import create_product_search
 
 
 class RoleEnum(str, PyEnum):
@@ -12,6 +14,16 @@ class PaymentStatusEnum(str, PyEnum):
     pending = "pending"
     paid = "paid"
     overdue = "overdue"
+class JobStatusEnum(str, PyEnum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+class EmailStatusEnum(str, PyEnum):
+    pending = "pending"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
     
 class User(Base):
     __tablename__ = "users"
@@ -68,7 +80,14 @@ class Purchase(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=True)
 
-    purchase_installments = relationship("Installment", backref="purchase", lazy="joined")
+    purchase_installments = relationship("Installment", backref="purchase")
+
+    __table_args__ = (
+        # Purchase listings: newest first, optionally per user or per status
+        Index('ix_purchases_user_id_created_at', 'user_id', 'created_at', 'id'),
+        Index('ix_purchases_status_created_at', 'status', 'created_at', 'id'),
+        Index('ix_purchases_created_at', 'created_at', 'id'),
+    )
 
 class Installment(Base):
     __tablename__ = "installments"
@@ -81,6 +100,15 @@ class Installment(Base):
     status = Column(String, default=PaymentStatusEnum.pending.value)
     is_paid = Column(Boolean, default=False)
 
+    __table_args__ = (
+        # Drives the overdue sweep: pending installments ordered by due date
+        Index('ix_installments_status_due_date', 'status', 'due_date'),
+        # A user's installments are reached through their purchases
+        Index('ix_installments_purchase_id_due_date', 'purchase_id', 'due_date'),
+        # Admin installment listing, ordered by due date
+        Index('ix_installments_due_date', 'due_date', 'id'),
+    )
+
 class Notification(Base):
     __tablename__ = "notifications"
     
@@ -91,6 +119,27 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_notifications_user_id_created_at', 'user_id', 'created_at'),
+        # Admin notification listing, newest first
+        Index('ix_notifications_created_at', 'created_at', 'id'),
+    )
+
+class NotificationJob(Base):
+    __tablename__ = "notification_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    audience = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    notification_type = Column(String, nullable=False)
+    status = Column(String, default=JobStatusEnum.pending.value, nullable=False)
+    total = Column(Integer, nullable=True)
+    processed = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
 class CartItem(Base):
     __tablename__ = "cart_items"
     id = Column(Integer, primary_key=True, index=True)
@@ -108,3 +157,42 @@ class CartItem(Base):
     __table_args__ = (
         UniqueConstraint('user_id', 'product_id', name='unique_user_product_cart'),
     )
+
+class DailyRollup(Base):
+    __tablename__ = "daily_rollups"
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+    status = Column(String, nullable=False)
+    # Purchases created on this day, bucketed by purchase status
+    purchase_count = Column(Integer, default=0, nullable=False)
+    paid_amount = Column(Float, default=0, nullable=False)
+    due_amount = Column(Float, default=0, nullable=False)
+    # Installments of those purchases, bucketed by installment status
+    installment_count = Column(Integer, default=0, nullable=False)
+    installment_amount = Column(Float, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('day', 'category_id', 'status', name='unique_daily_rollup'),
+    )
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(String, nullable=False)
+    status = Column(String, default=EmailStatusEnum.pending.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(String, nullable=True)
+    # Earliest time the message may be (re)tried; doubles as the lease expiry while sending
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_email_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+# Full-text search over products lives outside the ORM tables
+event.listen(Base.metadata, "after_create", create_product_search)
@@ -0,0 +1,51 @@
+from sqlalchemy import text
+
+# Must match the expression the search query ranks on, or Postgres won't use the index
+POSTGRES_PRODUCT_DOCUMENT = "coalesce(name, '') || ' ' || coalesce(description, '')"
+
+SQLITE_PRODUCT_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE products_fts USING fts5(
+        name, description,
+        content='products', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    # Index rows that existed before the search table did
+    "INSERT INTO products_fts(products_fts) VALUES ('rebuild')",
+)
+
+def create_product_search(target, connection, **kw) -> None:
+    """Create the product full-text index if it is missing; safe to run on every startup"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_products_search ON products "
+            f"USING gin (to_tsvector('english', {POSTGRES_PRODUCT_DOCUMENT}))"
+        ))
+    elif connection.dialect.name == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+        )).first()
+        if not exists:
+            for statement in SQLITE_PRODUCT_SEARCH_DDL:
+                connection.execute(text(statement))
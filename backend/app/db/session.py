@@ -1,14 +1,92 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+from app.core.metrics import TimedCheckoutPool, instrument_engine
+from app.core.query_log import note_lazy_load
 
-# Initializing the database connection with sqlite
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"  
+def _database_url(url: str) -> str:
+    # Hosting providers hand out postgres:// URLs, which SQLAlchemy no longer accepts
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+SQLALCHEMY_DATABASE_URL = _database_url(settings.DATABASE_URL)
+
+# Async drivers for the same databases; psycopg (v3) serves both sync and async
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "psycopg"}
+
+class InstrumentedQueuePool(TimedCheckoutPool, QueuePool):
+    metrics_name = "sync"
+
+class InstrumentedAsyncQueuePool(TimedCheckoutPool, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+def _engine_options(url, poolclass) -> dict:
+    if url.get_backend_name() == "sqlite":
+        options = {"connect_args": {"check_same_thread": False}}
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection; leave SQLAlchemy's pool choice alone
+            return options
+    else:
+        options = {"connect_args": {}}
+        if url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            options["connect_args"]["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING
+    )
+    return options
+
+def _configure_sqlite(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a write is in progress; NORMAL is durable enough under WAL
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL):
+    """Build an engine for url with the configured pool and per-backend connection settings"""
+    url = make_url(url)
+    engine = create_engine(url, **_engine_options(url, InstrumentedQueuePool))
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine, "connect", _configure_sqlite)
+    instrument_engine(engine, "sync")
+    return engine
+
+def create_async_db_engine(url: str = SQLALCHEMY_DATABASE_URL):
+    """Async counterpart of create_db_engine for the same database"""
+    url = make_url(url)
+    url = url.set(drivername=f"{url.get_backend_name()}+{ASYNC_DRIVERS[url.get_backend_name()]}")
+    engine = create_async_engine(url, **_engine_options(url, InstrumentedAsyncQueuePool))
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", _configure_sqlite)
+    instrument_engine(engine.sync_engine, "async")
+    return engine
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async_engine = create_async_db_engine()
+# Nothing is lazy-loaded after commit on the event loop, so keep attributes loaded
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Covers the sync sessions behind AsyncSession too
+event.listen(Session, "do_orm_execute", note_lazy_load)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,27 +1,30 @@
+import asyncio
+from contextlib import asynccontextmanager
 from app.api.router import auth, installments, purchases, users, categories, cart
-from fastapi import FastAPI, Request
-from app.api.router import products, reports, notifications, admin_stats
+from fastapi import FastAPI
+from app.api.router import products, reports, notifications, admin_stats, metrics
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from app.db.session import engine
-from app.db.base import Base
-from app.core.init_data import initialize_data
+from app.db.session import async_engine
+from app.core.config import settings
+from app.core.tasks import overdue_sweeper, email_worker
+from app.core.hashing import shutdown_password_pool
+from app.core.metrics import MetricsMiddleware
 
-# Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+    if settings.OVERDUE_SWEEP_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(overdue_sweeper(settings.OVERDUE_SWEEP_INTERVAL)))
+    if settings.EMAIL_POLL_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(email_worker(settings.EMAIL_POLL_INTERVAL)))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    shutdown_password_pool()
+    await async_engine.dispose()
 
-app = FastAPI(title="Installment Tracker API")
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    print(f"Incoming request: {request.method} {request.url}")
-    response = await call_next(request)
-    print(f"Response status: {response.status_code}")
-    return response
-
-# Initialize default data on startup
-with Session(engine) as db:
-    initialize_data(db)
+app = FastAPI(title="Installment Tracker API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +33,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
@@ -41,3 +45,4 @@ app.include_router(notifications.router, prefix="/api/v1/notifications", tags=["
 app.include_router(reports.router, prefix="/api/v1/reports", tags=["Reports"])
 app.include_router(admin_stats.router, prefix="/api/v1/admin/stats", tags=["Admin Stats"])
 app.include_router(cart.router, prefix="/api/v1/cart", tags=["Cart"])
+app.include_router(metrics.router, tags=["Metrics"])
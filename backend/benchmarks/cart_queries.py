@@ -0,0 +1,66 @@
+"""Check that reading a cart costs the same number of queries at any cart size.
+
+Run from the backend directory:
+
+    python -m benchmarks.cart_queries
+"""
+import sys
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.base import Base
+from app.db import models
+from app.api.schemas.cart import CartResponse
+from app.api.service.cart import get_cart
+from benchmarks.query_budgets import count_statements
+
+CART_SIZES = (1, 5, 20, 50)
+
+def seed(db, cart_size: int) -> int:
+    user = models.User(
+        email=f"bench{cart_size}@example.com",
+        name="Bench",
+        phone_number=f"0{cart_size:010d}",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True
+    )
+    db.add(user)
+    for i in range(cart_size):
+        # One category per product so every item needs its own category row
+        category = models.Category(name=f"bench-{cart_size}-{i}")
+        product = models.Product(category=category, name=f"Product {i}", price=10.0 + i, stock=100)
+        db.add(models.CartItem(user=user, product=product, quantity=1 + i % 3))
+    db.commit()
+    return user.id
+
+def count_queries(engine, db, user_id: int) -> int:
+    db.expunge_all()
+    with count_statements(engine) as statements:
+        # Serialize like the endpoint does so lazy loads are counted too
+        CartResponse.model_validate(get_cart(db, user_id))
+    return len(statements)
+
+def main() -> int:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    counts = {}
+    with Session() as db:
+        for size in CART_SIZES:
+            counts[size] = count_queries(engine, db, seed(db, size))
+            print(f"cart of {size:>3} items: {counts[size]} queries")
+
+    if len(set(counts.values())) != 1:
+        print("FAIL: query count grows with cart size")
+        return 1
+    print("OK: query count is constant")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
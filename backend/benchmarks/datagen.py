@@ -0,0 +1,186 @@
+"""Deterministic synthetic data for benchmarks, written with bulk inserts.
+
+Every user, the admin included, gets BENCH_PASSWORD so the load runner can log
+in as anyone. Purchase and installment statuses are consistent with their due
+dates, and the daily rollup is rebuilt at the end so reports and the dashboard
+see the generated purchases.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Iterator, List
+from sqlalchemy import insert, text
+from sqlalchemy.orm import sessionmaker
+from app.db import models
+from app.core.hashing import get_password_hash
+from app.api.service.rollups import rebuild_rollups
+
+BENCH_PASSWORD = "bench-password"
+ADMIN_EMAIL = "admin@bench.example"
+
+DEFAULT_SCALE = {
+    "users": 1000,
+    "categories": 20,
+    "products": 500,
+    "purchases": 10000,
+    "installments_per_purchase": 5,
+    "cart_users": 200,
+}
+
+def _chunks(rows: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _split(total: float, parts: int) -> List[float]:
+    share = math.floor(total / parts * 100) / 100
+    return [share] * (parts - 1) + [round(total - share * (parts - 1), 2)]
+
+def _users(count: int, hashed_password: str, rng: random.Random, now: datetime) -> Iterator[dict]:
+    for user_id in range(1, count + 1):
+        admin = user_id == 1
+        yield {
+            "id": user_id,
+            "name": "Bench Admin" if admin else f"Bench User {user_id}",
+            "email": ADMIN_EMAIL if admin else f"user{user_id}@bench.example",
+            "hashed_password": hashed_password,
+            "role": models.RoleEnum.admin.value if admin else models.RoleEnum.customer.value,
+            "is_active": True,
+            "is_verified": True,
+            "created_at": now - timedelta(days=rng.uniform(0, 730)),
+        }
+
+def _purchases(scale: dict, prices: List[float], rng: random.Random, now: datetime):
+    """Yield (purchase row, installment rows) pairs"""
+    parts = scale["installments_per_purchase"]
+    paid = models.PaymentStatusEnum.paid.value
+    pending = models.PaymentStatusEnum.pending.value
+    overdue = models.PaymentStatusEnum.overdue.value
+    installment_id = 0
+
+    for purchase_id in range(1, scale["purchases"] + 1):
+        product_id = rng.randint(1, len(prices))
+        quantity = rng.randint(1, 3)
+        total = round(prices[product_id - 1] * quantity, 2)
+        created_at = now - timedelta(days=rng.uniform(0, 365))
+
+        installments = []
+        for number, amount in enumerate(_split(total, parts), start=1):
+            installment_id += 1
+            due_date = created_at + timedelta(days=30 * number)
+            is_paid = due_date < now and rng.random() < 0.8
+            if is_paid:
+                status = paid
+            elif due_date < now:
+                status = overdue
+            else:
+                status = pending
+            installments.append({
+                "id": installment_id,
+                "purchase_id": purchase_id,
+                "installment_no": number,
+                "amount": amount,
+                "due_date": due_date,
+                "paid_date": due_date - timedelta(days=rng.randint(0, 5)) if is_paid else None,
+                "status": status,
+                "is_paid": is_paid,
+            })
+
+        statuses = {installment["status"] for installment in installments}
+        paid_amount = round(sum(i["amount"] for i in installments if i["is_paid"]), 2)
+        if statuses == {paid}:
+            status = paid
+        elif overdue in statuses:
+            status = overdue
+        else:
+            status = pending
+        purchase = {
+            "id": purchase_id,
+            "user_id": rng.randint(2, scale["users"]),
+            "product_id": product_id,
+            "quantity": quantity,
+            "total_amount": total,
+            "paid_amount": paid_amount,
+            "due_amount": round(total - paid_amount, 2),
+            "number_of_installments": parts,
+            "status": status,
+            "created_at": created_at,
+        }
+        yield purchase, installments
+
+def generate(engine, scale: dict, seed: int = 0, chunk_size: int = 10000, progress=print) -> dict:
+    """Fill an empty, migrated database; returns the number of rows written per table"""
+    scale = {**DEFAULT_SCALE, **scale}
+    if scale["users"] < 2:
+        raise ValueError("Need at least one customer besides the admin")
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # One bcrypt hash for everyone; hashing per user would dominate seeding
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    written = {}
+
+    def write(model, rows: Iterator[dict]) -> None:
+        count = 0
+        for chunk in _chunks(rows, chunk_size):
+            with engine.begin() as connection:
+                connection.execute(insert(model), chunk)
+            count += len(chunk)
+        written[model.__tablename__] = count
+        progress(f"{model.__tablename__}: {count} rows")
+
+    write(models.User, _users(scale["users"], hashed_password, rng, now))
+    write(models.Category, (
+        {"id": i, "name": f"Bench Category {i}"} for i in range(1, scale["categories"] + 1)
+    ))
+
+    prices = [round(rng.uniform(5, 2000), 2) for _ in range(scale["products"])]
+    write(models.Product, (
+        {
+            "id": i,
+            "category_id": rng.randint(1, scale["categories"]),
+            "name": f"Bench Product {i}",
+            "description": f"Synthetic product {i} for load benchmarks",
+            "price": price,
+            "stock": 10**6,
+        }
+        for i, price in enumerate(prices, start=1)
+    ))
+
+    # Purchases and their installments are generated together, so write them chunk by chunk
+    purchase_count = installment_count = 0
+    for chunk in _chunks(_purchases(scale, prices, rng, now), max(1, chunk_size // scale["installments_per_purchase"])):
+        with engine.begin() as connection:
+            connection.execute(insert(models.Purchase), [purchase for purchase, _ in chunk])
+            installments = [row for _, rows in chunk for row in rows]
+            connection.execute(insert(models.Installment), installments)
+        purchase_count += len(chunk)
+        installment_count += len(installments)
+    written["purchases"] = purchase_count
+    written["installments"] = installment_count
+    progress(f"purchases: {purchase_count} rows, installments: {installment_count} rows")
+
+    cart_users = min(scale["cart_users"], scale["users"] - 1)
+    write(models.CartItem, (
+        {"user_id": user_id, "product_id": product_id, "quantity": rng.randint(1, 3)}
+        for user_id in range(2, cart_users + 2)
+        for product_id in rng.sample(range(1, scale["products"] + 1), min(rng.randint(1, 5), scale["products"]))
+    ))
+
+    with sessionmaker(bind=engine)() as db:
+        written["daily_rollups"] = rebuild_rollups(db)
+    progress(f"daily_rollups: {written['daily_rollups']} rows")
+
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            # Ids were written explicitly, so move the sequences past them
+            for table in ("users", "categories", "products", "purchases", "installments"):
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                ))
+        connection.execute(text("ANALYZE"))
+    return written
@@ -0,0 +1,142 @@
+"""Check outbox delivery against a local SMTP server.
+
+Starts an aiosmtpd stand-in and drives deliver_pending_emails with a real
+SMTPMailer. It checks three things: queued OTP emails arrive over one reused
+session; the mailer reconnects once when the server drops that session; and
+while the server is down, a message backs off exponentially and is marked
+failed after EMAIL_MAX_ATTEMPTS. Run from the backend directory with
+requirements-dev.txt installed:
+
+    python -m benchmarks.email_delivery
+"""
+import os
+import socket
+import sys
+from datetime import datetime, timedelta
+
+MAX_ATTEMPTS = 3
+BACKOFF = 60
+SENDER = "noreply@check.example"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class Inbox:
+    """aiosmtpd handler keeping every message and the client address it came from"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos, envelope.content.decode()))
+        return "250 OK"
+
+def main() -> int:
+    port = free_port()
+    # Settings are read at import time
+    os.environ.update({
+        "EMAIL_HOST": "127.0.0.1",
+        "EMAIL_PORT": str(port),
+        "EMAIL_USE_TLS": "false",
+        "EMAIL_USER": SENDER,
+        "EMAIL_PASS": "",
+        "EMAIL_MAX_ATTEMPTS": str(MAX_ATTEMPTS),
+        "EMAIL_RETRY_BACKOFF": str(BACKOFF),
+    })
+
+    from aiosmtpd.controller import Controller
+    from sqlalchemy import create_engine, select, update
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.db.base import Base
+    from app.db import models
+    from app.core.email_utils import SMTPMailer, deliver_pending_emails
+    from app.api.service.auth import send_otp_email
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    inbox = Inbox()
+    def start_server() -> Controller:
+        controller = Controller(inbox, hostname="127.0.0.1", port=port)
+        controller.start()
+        return controller
+
+    def outbox(db, to_email: str) -> models.EmailOutbox:
+        db.expire_all()
+        return db.scalars(select(models.EmailOutbox).where(models.EmailOutbox.to_email == to_email)).one()
+
+    failures = []
+    def check(condition: bool, message: str) -> None:
+        print(("ok    " if condition else "FAIL  ") + message)
+        if not condition:
+            failures.append(message)
+
+    mailer = SMTPMailer()
+    server = start_server()
+    try:
+        with Session() as db:
+            recipients = [f"user{i}@check.example" for i in range(3)]
+            for i, email in enumerate(recipients):
+                send_otp_email(db, email, f"{100000 + i}")
+            claimed = deliver_pending_emails(db, mailer)
+            check(claimed == 3, f"claimed the 3 queued OTP emails ({claimed})")
+            check(sorted(rcpt[0] for _, rcpt, _ in inbox.messages) == recipients, "every OTP email arrived")
+            check(all("Your OTP code is: 1000" in content for _, _, content in inbox.messages), "bodies carry the OTP")
+            check(len({peer for peer, _, _ in inbox.messages}) == 1, "one SMTP session served the whole batch")
+            check(all(outbox(db, email).status == models.EmailStatusEnum.sent.value for email in recipients),
+                  "outbox rows are marked sent")
+            check(deliver_pending_emails(db, mailer) == 0, "sent messages are not claimed again")
+
+            # Restarting the server drops the session the mailer is holding
+            first_peer = inbox.messages[0][0]
+            server.stop()
+            server = start_server()
+            send_otp_email(db, "reconnect@check.example", "200000")
+            deliver_pending_emails(db, mailer)
+            message = outbox(db, "reconnect@check.example")
+            check(message.status == models.EmailStatusEnum.sent.value and message.attempts == 1,
+                  f"reconnected once after the dropped session (status {message.status}, attempts {message.attempts})")
+            peer, rcpt_tos, _ = inbox.messages[-1]
+            check(rcpt_tos == ["reconnect@check.example"] and peer != first_peer, "it arrived over a new session")
+
+            server.stop()
+            server = None
+            send_otp_email(db, "down@check.example", "300000")
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                started = datetime.utcnow()
+                deliver_pending_emails(db, mailer)
+                message = outbox(db, "down@check.example")
+                if attempt < MAX_ATTEMPTS:
+                    delay = (message.next_attempt_at - started).total_seconds()
+                    expected = BACKOFF * 2 ** (attempt - 1)
+                    check(message.status == models.EmailStatusEnum.pending.value and expected <= delay < expected + 5,
+                          f"attempt {attempt} failed and retries in {delay:.0f}s (expected {expected}s)")
+                    check(deliver_pending_emails(db, mailer) == 0, f"not retried before its backoff after attempt {attempt}")
+                    # Let the backoff elapse
+                    db.execute(
+                        update(models.EmailOutbox)
+                        .where(models.EmailOutbox.id == message.id)
+                        .values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1))
+                    )
+                    db.commit()
+            check(message.status == models.EmailStatusEnum.failed.value and message.attempts == MAX_ATTEMPTS,
+                  f"marked failed after {MAX_ATTEMPTS} attempts (status {message.status}, attempts {message.attempts})")
+            check(bool(message.last_error), "the last error is recorded")
+            check(deliver_pending_emails(db, mailer) == 0, "failed messages are not claimed again")
+    finally:
+        mailer.close()
+        if server is not None:
+            server.stop()
+
+    if failures:
+        print(f"FAIL: {len(failures)} checks failed")
+        return 1
+    print("OK: outbox delivery behaves as expected")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
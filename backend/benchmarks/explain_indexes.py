@@ -0,0 +1,133 @@
+"""Check that the listing and report queries are served by the indexes in migrations/.
+
+Migrates a scratch SQLite database to head, seeds it, runs the real service
+functions and asserts EXPLAIN QUERY PLAN of their SQL names the expected index.
+Run from the backend directory:
+
+    python -m benchmarks.explain_indexes
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from sqlalchemy import event, insert, text
+from sqlalchemy.orm import sessionmaker
+from app.db import models
+from app.db.session import create_db_engine
+from app.db.migrations import upgrade_database
+from app.api.schemas.reports import ReportRequest
+from app.api.service.installments import get_user_installments
+from app.api.service.purchases import get_purchases_with_installments
+from app.api.service.notifications import get_notifications
+from app.api.service.reports import generate_report
+
+def seed(db, users: int = 50, purchases: int = 2000) -> None:
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    db.execute(insert(models.Category), [{"id": 1, "name": "Bench"}])
+    db.execute(insert(models.Product), [{"id": 1, "category_id": 1, "name": "Bench", "price": 100.0, "stock": 10**6}])
+    db.execute(insert(models.User), [
+        {"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "hashed_password": "x", "role": "customer"}
+        for i in range(1, users + 1)
+    ])
+    statuses = [status.value for status in models.PaymentStatusEnum]
+    db.execute(insert(models.Purchase), [
+        {
+            "id": i, "user_id": rng.randint(1, users), "product_id": 1, "quantity": 1,
+            "total_amount": 300.0, "paid_amount": 0.0, "due_amount": 300.0, "number_of_installments": 3,
+            "status": rng.choice(statuses), "created_at": now - timedelta(minutes=i)
+        }
+        for i in range(1, purchases + 1)
+    ])
+    db.execute(insert(models.Installment), [
+        {
+            "purchase_id": i, "installment_no": n, "amount": 100.0,
+            "due_date": now + timedelta(days=30 * n - i % 90), "status": rng.choice(statuses), "is_paid": False
+        }
+        for i in range(1, purchases + 1) for n in (1, 2, 3)
+    ])
+    db.execute(insert(models.Notification), [
+        {"user_id": rng.randint(1, users), "message": "Hello", "notification_type": "system", "created_at": now - timedelta(minutes=i)}
+        for i in range(purchases)
+    ])
+    db.execute(insert(models.DailyRollup), [
+        {"day": date.today() - timedelta(days=d), "category_id": 1, "status": status,
+         "purchase_count": 1, "paid_amount": 0, "due_amount": 1, "installment_count": 1, "installment_amount": 1}
+        for d in range(365) for status in statuses
+    ])
+    db.commit()
+    db.execute(text("ANALYZE"))
+
+def query_plans(engine, db, fn) -> str:
+    """Run fn and return the EXPLAIN QUERY PLAN output of every SELECT it issued"""
+    statements = []
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            plans.extend(row[-1] for row in rows)
+    return "\n".join(plans)
+
+def main() -> int:
+    admin = models.User(id=0, role="admin")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Percent-encoded like a DATABASE_URL with an encoded password; decodes to explain-indexes.db
+        url = f"sqlite:///{os.path.join(tmp, 'explain%2Dindexes.db')}"
+        upgrade_database(url)
+        engine = create_db_engine(url)
+        with sessionmaker(bind=engine)() as db:
+            seed(db)
+            cases = [
+                ("installments of a user",
+                 lambda: get_user_installments(db, user_id=7),
+                 ["ix_purchases_user_id_created_at", "ix_installments_purchase_id_due_date"]),
+                ("all installments by due date",
+                 lambda: get_user_installments(db, user_id=None, is_admin=True, include_total=False),
+                 ["ix_installments_due_date"]),
+                ("installments by status",
+                 lambda: get_user_installments(db, user_id=None, is_admin=True, status="overdue", include_total=False),
+                 ["ix_installments_status_due_date"]),
+                ("purchases of a user",
+                 lambda: get_purchases_with_installments(db, user_id=7),
+                 ["ix_purchases_user_id_created_at"]),
+                ("all purchases",
+                 lambda: get_purchases_with_installments(db, include_total=False),
+                 ["ix_purchases_created_at"]),
+                ("purchases by status",
+                 lambda: get_purchases_with_installments(db, status="overdue", include_total=False),
+                 ["ix_purchases_status_created_at"]),
+                ("notifications",
+                 lambda: get_notifications(db, admin, include_total=False),
+                 ["ix_notifications_created_at"]),
+                ("report",
+                 lambda: generate_report(db, ReportRequest(
+                     start_date=date.today() - timedelta(days=90), end_date=date.today()
+                 )),
+                 ["sqlite_autoindex_daily_rollups_1"]),
+            ]
+
+            failures = 0
+            for name, fn, indexes in cases:
+                plan = query_plans(engine, db, fn)
+                missing = [index for index in indexes if index not in plan]
+                print(f"{'FAIL' if missing else 'ok  '} {name}")
+                if missing:
+                    failures += 1
+                    print(f"     missing {', '.join(missing)} in plan:")
+                    print("     " + plan.replace("\n", "\n     "))
+        engine.dispose()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Load benchmark of the hot read endpoints against synthetic data.
+
+Seed a database once, then drive the real app in-process over ASGI and
+report latency percentiles, throughput and queries per request per endpoint.
+Run from the backend directory with requirements-dev.txt installed:
+
+    python -m benchmarks.load seed --users 100000 --purchases 1000000 --installments-per-purchase 5
+    python -m benchmarks.load run --save benchmarks/baselines/main.json
+    python -m benchmarks.load run --compare benchmarks/baselines/main.json
+
+The database defaults to sqlite:///./bench.db; pass --database-url for another
+one. Caches stay on, as in production, so repeated pages measure cache hits.
+Comparing exits non-zero when a latency, throughput or queries-per-request
+figure moved the wrong way by more than --tolerance. Exact per-request query
+counts, with caches off, are checked by benchmarks.query_budgets.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+
+# name -> (route template as labelled by the metrics middleware, needs admin)
+SCENARIOS = {
+    "products_list": ("/api/v1/products/", False),
+    "cart_read": ("/api/v1/cart/", False),
+    "installments_me": ("/api/v1/installments/me", False),
+    "installments_admin": ("/api/v1/installments/admin", True),
+    "admin_dashboard": ("/api/v1/admin/stats/dashboard", True),
+    "reports": ("/api/v1/reports/", True),
+}
+
+# Higher is worse for all of these except throughput
+LATENCY_FIELDS = ("p50_ms", "p95_ms", "p99_ms")
+
+def _scenario_url(name: str, rng: random.Random, product_pages: int) -> str:
+    path = SCENARIOS[name][0]
+    if name == "products_list":
+        return f"{path}?page={rng.randint(1, product_pages)}&size=20"
+    if name in ("installments_me", "installments_admin"):
+        return f"{path}?page={rng.randint(1, 5)}&page_size=20"
+    if name == "reports":
+        start = date.today() - timedelta(days=rng.randint(90, 365))
+        return f"{path}?start_date_str={start}&end_date_str={start + timedelta(days=90)}"
+    return path
+
+def summarize(latencies: list, errors: int, elapsed: float, queries: float) -> dict:
+    """Percentiles in milliseconds, throughput and average queries per request"""
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "queries_per_request": round(queries, 2),
+    }
+
+async def _login(client, email: str) -> dict:
+    from benchmarks.datagen import BENCH_PASSWORD
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def _run_scenario(client, name: str, args, admin: dict, customers: list, product_pages: int) -> dict:
+    from app.core.metrics import http_request_db_queries
+
+    rng = random.Random(f"{args.seed}-{name}")
+    route, needs_admin = SCENARIOS[name]
+    latencies = []
+    errors = 0
+
+    async def one_request(record: bool) -> None:
+        nonlocal errors
+        headers = admin if needs_admin else rng.choice(customers)
+        url = _scenario_url(name, rng, product_pages)
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        elapsed = time.perf_counter() - started
+        if record:
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors += 1
+
+    for _ in range(args.warmup):
+        await one_request(record=False)
+
+    remaining = args.requests
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await one_request(record=True)
+
+    count_before, queries_before = http_request_db_queries.snapshot("GET", route)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    count_after, queries_after = http_request_db_queries.snapshot("GET", route)
+
+    served = count_after - count_before
+    return summarize(latencies, errors, elapsed, (queries_after - queries_before) / served if served else 0.0)
+
+async def run_benchmark(args) -> dict:
+    import httpx
+    from sqlalchemy import func, select
+    from app.main import app
+    from app.db import models
+    from app.db.session import SessionLocal, async_engine
+    from app.core.hashing import shutdown_password_pool
+    from benchmarks.datagen import ADMIN_EMAIL
+
+    with SessionLocal() as db:
+        counts = {
+            model.__tablename__: db.scalar(select(func.count()).select_from(model))
+            for model in (models.User, models.Product, models.Purchase, models.Installment, models.CartItem)
+        }
+        # Customers with something in their cart, so every scenario has data to read
+        customer_emails = db.scalars(
+            select(models.User.email)
+            .where(models.User.id.in_(select(models.CartItem.user_id)))
+            .order_by(models.User.id)
+            .limit(args.customers)
+        ).all()
+    if not counts["users"] or not customer_emails:
+        raise SystemExit("The database has no benchmark data; run the seed command first")
+
+    product_pages = max(1, -(-counts["products"] // 20))
+    scenarios = args.scenario or list(SCENARIOS)
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            admin = await _login(client, ADMIN_EMAIL)
+            customers = [await _login(client, email) for email in customer_emails]
+            for name in scenarios:
+                results[name] = await _run_scenario(client, name, args, admin, customers, product_pages)
+                _print_result(name, results[name])
+    finally:
+        shutdown_password_pool()
+        await async_engine.dispose()
+
+    return {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "database": args.database_url.split("://", 1)[0],
+        "rows": counts,
+        "python": platform.python_version(),
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": results,
+    }
+
+def _print_result(name: str, result: dict) -> None:
+    print(
+        f"{name:<20} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+        f"p99 {result['p99_ms']:>8.2f} ms  {result['throughput_rps']:>8.1f} req/s  "
+        f"{result['queries_per_request']:>5.2f} queries/req  {result['errors']} errors"
+    )
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """Print changes against a baseline and return the regressions found"""
+    regressions = []
+    if baseline.get("rows") != current.get("rows"):
+        print(f"note: row counts differ from the baseline ({baseline.get('rows')})")
+
+    for name, result in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            print(f"{name}: not in baseline")
+            continue
+
+        changes = []
+        # Queries per request is a mean over cache hits and misses, which vary with
+        # concurrency, so it gets the same tolerance as the timings
+        for field in LATENCY_FIELDS + ("throughput_rps", "queries_per_request"):
+            old, new = before[field], result[field]
+            change = (new - old) / old if old else 0.0
+            changes.append(f"{field} {old} -> {new} ({change:+.0%})")
+            worse = change < -tolerance if field == "throughput_rps" else change > tolerance
+            if worse:
+                regressions.append(f"{name} {field} {old} -> {new}")
+        print(f"{name}: " + ", ".join(changes))
+    return regressions
+
+def seed_command(args) -> int:
+    from sqlalchemy import func, select
+    from app.db import models
+    from app.db.migrations import upgrade_database
+    from app.db.session import create_db_engine
+    from benchmarks.datagen import generate
+
+    upgrade_database(args.database_url)
+    engine = create_db_engine(args.database_url)
+    try:
+        with engine.connect() as connection:
+            if connection.scalar(select(func.count()).select_from(models.User)):
+                print("The database already has users; seed into an empty database")
+                return 1
+        started = time.perf_counter()
+        generate(engine, {
+            "users": args.users,
+            "categories": args.categories,
+            "products": args.products,
+            "purchases": args.purchases,
+            "installments_per_purchase": args.installments_per_purchase,
+            "cart_users": args.cart_users,
+        }, seed=args.seed)
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+    finally:
+        engine.dispose()
+    return 0
+
+def run_command(args) -> int:
+    report = asyncio.run(run_benchmark(args))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            print("REGRESSED: " + "; ".join(regressions))
+            return 1
+        print("OK: within tolerance of the baseline")
+    return 0
+
+def main() -> int:
+    # The app reads its settings and builds its engines at import time, so pick the database first
+    database = argparse.ArgumentParser(add_help=False)
+    database.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    known, _ = database.parse_known_args()
+    os.environ["DATABASE_URL"] = known.database_url
+    os.environ["QUERY_LOG_ENABLED"] = "false"
+
+    from benchmarks.datagen import DEFAULT_SCALE
+
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description=__doc__.split("\n\n")[0],
+        parents=[database]
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for data and request mix")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Migrate and fill an empty database with synthetic data")
+    for field, default in DEFAULT_SCALE.items():
+        seed.add_argument("--" + field.replace("_", "-"), type=int, default=default)
+
+    run = commands.add_parser("run", help="Benchmark the hot endpoints against a seeded database")
+    run.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint")
+    run.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per endpoint first")
+    run.add_argument("--concurrency", type=int, default=8)
+    run.add_argument("--customers", type=int, default=20, help="Distinct customers to spread requests over")
+    run.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Repeat to pick endpoints; default all")
+    run.add_argument("--save", help="Write the results to this JSON file")
+    run.add_argument("--compare", help="Compare against a JSON file written by --save")
+    run.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative change, e.g. 0.2 for 20%%")
+
+    args = parser.parse_args()
+    return seed_command(args) if args.command == "seed" else run_command(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
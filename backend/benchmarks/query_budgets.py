@@ -0,0 +1,247 @@
+"""Check that every router stays within a fixed SQL statement budget per request.
+
+Seeds a scratch database with a customer who owns one of everything and one
+who owns many, then drives the real app in-process. Each case requests a
+small and a large result, e.g. a product page of 1 and of 100 items. It fails
+when the large request issues more statements than the small one (queries
+scale with result size, typically a lazy load per row) or when either exceeds
+the case's budget. Caches are disabled so the database path is what is
+measured. Run from the backend directory with requirements-dev.txt installed:
+
+    python -m benchmarks.query_budgets
+
+Exits non-zero on any violation and prints the offending statements.
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, NamedTuple, Optional
+from sqlalchemy import event
+
+PASSWORD = "budget-password"
+ADMIN_EMAIL = "admin@budget.example"
+FEW_EMAIL = "few@budget.example"
+MANY_EMAIL = "many@budget.example"
+# Rows owned by the "many" customer, per kind
+MANY = 40
+
+@contextmanager
+def count_statements(*engines) -> Iterator[List[str]]:
+    """Collect the SQL statements executed on engines while the block runs.
+
+    Pass AsyncEngine.sync_engine for async engines.
+    """
+    statements: List[str] = []
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+class Case(NamedTuple):
+    router: str
+    name: str
+    method: str
+    user: Optional[str]
+    small: str
+    large: Optional[str]
+    budget: int
+    small_body: Optional[dict] = None
+    large_body: Optional[dict] = None
+
+def _plan(parts: int) -> dict:
+    return {
+        "user_id": 3, "product_id": 1, "quantity": 1,
+        "installment_plan": [{"amount": 100.0 / parts, "days_after": 30 * (i + 1)} for i in range(parts)],
+    }
+
+# Budgets include authenticating the caller. Writes come last since they change the data.
+CASES = [
+    Case("auth", "login", "POST", None, "/api/v1/auth/login", None, 1,
+         small_body={"email": FEW_EMAIL, "password": PASSWORD}),
+    Case("users", "me", "GET", "few", "/api/v1/users/me", None, 1),
+    Case("users", "admin customers", "GET", "admin",
+         "/api/v1/users/admin/customers?page_size=1", "/api/v1/users/admin/customers?page_size=100", 3),
+    Case("categories", "list", "GET", "few", "/api/v1/categories/?size=1", "/api/v1/categories/?size=100", 2),
+    Case("categories", "get", "GET", "few", "/api/v1/categories/1", None, 1),
+    Case("products", "list", "GET", "few", "/api/v1/products/?size=1", "/api/v1/products/?size=100", 2),
+    Case("products", "search", "GET", "few",
+         "/api/v1/products/search?q=budget&size=1", "/api/v1/products/search?q=budget&size=100", 2),
+    Case("products", "get", "GET", "few", "/api/v1/products/1", None, 1),
+    Case("cart", "read", "GET", "few", "/api/v1/cart/", None, 2),
+    Case("cart", "read many", "GET", "many", "/api/v1/cart/", None, 2),
+    Case("purchases", "me", "GET", "few", "/api/v1/purchases/me?page_size=100", None, 5),
+    Case("purchases", "me many", "GET", "many", "/api/v1/purchases/me?page_size=100", None, 5),
+    Case("purchases", "admin", "GET", "admin",
+         "/api/v1/purchases/admin?page_size=1", "/api/v1/purchases/admin?page_size=100", 5),
+    Case("installments", "me", "GET", "few", "/api/v1/installments/me?page_size=100", None, 3),
+    Case("installments", "me many", "GET", "many", "/api/v1/installments/me?page_size=100", None, 3),
+    Case("installments", "admin", "GET", "admin",
+         "/api/v1/installments/admin?page_size=1", "/api/v1/installments/admin?page_size=100", 3),
+    Case("installments", "stats", "GET", "many", "/api/v1/installments/stats", None, 2),
+    Case("notifications", "list", "GET", "admin",
+         "/api/v1/notifications/?size=1", "/api/v1/notifications/?size=100", 3),
+    Case("reports", "report", "GET", "admin",
+         "/api/v1/reports/?start_date_str=2020-01-01&end_date_str=2020-01-08",
+         "/api/v1/reports/?start_date_str=2020-01-01&end_date_str=2021-01-01", 2),
+    Case("admin_stats", "dashboard", "GET", "admin", "/api/v1/admin/stats/dashboard", None, 3),
+    Case("admin_stats", "overdue sweeps", "GET", "admin", "/api/v1/admin/stats/overdue-sweeps", None, 1),
+    Case("metrics", "metrics", "GET", "admin", "/metrics", None, 1),
+    Case("installments", "pay", "PATCH", "many", "/api/v1/installments/1/pay", None, 11),
+    Case("purchases", "create", "POST", "admin", "/api/v1/purchases/", "/api/v1/purchases/", 9,
+         small_body=_plan(1), large_body=_plan(12)),
+    Case("cart", "checkout", "POST", "few", "/api/v1/cart/checkout", None, 10,
+         small_body={"number_of_installments": 3}),
+    Case("cart", "checkout many", "POST", "many", "/api/v1/cart/checkout", None, 10,
+         small_body={"number_of_installments": 3}),
+]
+
+# Pairs of single-URL cases whose only difference is how many rows the caller owns
+SAME_SHAPE = [
+    ("cart", "read", "read many"),
+    ("purchases", "me", "me many"),
+    ("installments", "me", "me many"),
+    ("cart", "checkout", "checkout many"),
+]
+
+def seed(db) -> None:
+    from sqlalchemy import insert
+    from app.db import models
+    from app.core.hashing import get_password_hash
+    from app.api.service.rollups import rebuild_rollups
+
+    hashed_password = get_password_hash(PASSWORD)
+    now = datetime.utcnow()
+    db.execute(insert(models.User), [
+        {"id": user_id, "name": email, "email": email, "hashed_password": hashed_password,
+         "role": role, "is_active": True, "is_verified": True}
+        for user_id, email, role in (
+            (1, ADMIN_EMAIL, "admin"), (2, FEW_EMAIL, "customer"), (3, MANY_EMAIL, "customer")
+        )
+    ] + [
+        {"id": user_id, "name": f"Extra {user_id}", "email": f"extra{user_id}@budget.example",
+         "hashed_password": hashed_password, "role": "customer"}
+        for user_id in range(4, MANY + 4)
+    ])
+    # One category per product, so a per-row category load shows up
+    db.execute(insert(models.Category), [{"id": i, "name": f"Budget {i}"} for i in range(1, 2 * MANY + 1)])
+    db.execute(insert(models.Product), [
+        {"id": i, "category_id": i, "name": f"Budget product {i}", "price": 100.0, "stock": 10**6}
+        for i in range(1, 2 * MANY + 1)
+    ])
+
+    owned = {2: 1, 3: MANY}
+    purchase_id = 0
+    purchases, installments, notifications, cart_items = [], [], [], []
+    for user_id, count in owned.items():
+        for n in range(count):
+            purchase_id += 1
+            created_at = now - timedelta(days=n)
+            purchases.append({
+                "id": purchase_id, "user_id": user_id, "product_id": n + 1, "quantity": 1,
+                "total_amount": 300.0, "paid_amount": 0.0, "due_amount": 300.0,
+                "number_of_installments": 3, "status": "pending", "created_at": created_at,
+            })
+            installments.extend(
+                {"purchase_id": purchase_id, "installment_no": k, "amount": 100.0,
+                 "due_date": created_at + timedelta(days=30 * k), "status": "pending", "is_paid": False}
+                for k in (1, 2, 3)
+            )
+            notifications.append({"user_id": user_id, "message": f"Notice {n}", "notification_type": "system"})
+            cart_items.append({"user_id": user_id, "product_id": MANY + n + 1, "quantity": 1})
+    db.execute(insert(models.Purchase), purchases)
+    # The "many" customer's installments come first so /installments/1/pay is theirs
+    installments.sort(key=lambda row: row["purchase_id"] == 1)
+    db.execute(insert(models.Installment), installments)
+    db.execute(insert(models.Notification), notifications)
+    db.execute(insert(models.CartItem), cart_items)
+    db.commit()
+    rebuild_rollups(db)
+
+def measure(client, engines, case: Case, headers: dict, url: str, body: Optional[dict]):
+    with count_statements(*engines) as statements:
+        response = client.request(case.method, url, headers=headers, json=body)
+    if response.status_code >= 400:
+        raise AssertionError(f"{case.router} {case.name}: {case.method} {url} returned {response.status_code}: {response.text}")
+    return statements
+
+def main() -> int:
+    workdir = tempfile.mkdtemp(prefix="query-budgets-")
+    url = f"sqlite:///{os.path.join(workdir, 'budget.db')}"
+    # Settings are read at import time; disable caches so every request hits the database
+    os.environ.update({
+        "DATABASE_URL": url,
+        "USER_CACHE_TTL": "0",
+        "CATALOG_CACHE_TTL": "0",
+        "INSTALLMENT_STATS_CACHE_TTL": "0",
+        "QUERY_LOG_ENABLED": "false",
+        "BCRYPT_ROUNDS": "4",
+    })
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.db.migrations import upgrade_database
+    from app.db.session import SessionLocal, engine, async_engine
+    from app.core.hashing import shutdown_password_pool
+
+    upgrade_database(url)
+    with SessionLocal() as db:
+        seed(db)
+
+    engines = (engine, async_engine.sync_engine)
+    # No lifespan: the background sweeper and mailer would add their own statements
+    client = TestClient(app)
+    tokens = {}
+    for user, email in (("admin", ADMIN_EMAIL), ("few", FEW_EMAIL), ("many", MANY_EMAIL)):
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+        response.raise_for_status()
+        tokens[user] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    failures = []
+    counts = {}
+    try:
+        for case in CASES:
+            headers = tokens.get(case.user, {})
+            small = measure(client, engines, case, headers, case.small, case.small_body)
+            counts[(case.router, case.name)] = len(small)
+            line = f"{case.router:<14} {case.name:<16} {len(small):>3}"
+            worst = small
+
+            if case.large is not None:
+                large = measure(client, engines, case, headers, case.large, case.large_body or case.small_body)
+                line += f" -> {len(large):>3} for the larger result"
+                if len(large) > len(small):
+                    failures.append((f"{case.router} {case.name}: {len(small)} -> {len(large)} statements as the result grew", large))
+                worst = large if len(large) > len(small) else small
+
+            if len(worst) > case.budget:
+                failures.append((f"{case.router} {case.name}: {len(worst)} statements, budget {case.budget}", worst))
+            print(f"{line}  (budget {case.budget})")
+
+        for router, few, many in SAME_SHAPE:
+            if counts[(router, many)] > counts[(router, few)]:
+                failures.append((
+                    f"{router}: {counts[(router, few)]} statements for one row but {counts[(router, many)]} for {MANY}",
+                    []
+                ))
+    finally:
+        shutdown_password_pool()
+
+    if failures:
+        for message, statements in failures:
+            print(f"FAIL: {message}")
+            for statement in statements:
+                print("    " + " ".join(statement.split())[:160])
+        return 1
+    print(f"OK: {len(CASES)} cases within budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+from logging.config import fileConfig
+from alembic import context
+from app.db.base import Base
+from app.db import models  # noqa: F401 - registers the tables on Base.metadata
+from app.db.session import SQLALCHEMY_DATABASE_URL, create_db_engine
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_name(name, type_, parent_names) -> bool:
+    # The full-text index tables are managed by app/db/search.py, not the ORM
+    return not (type_ == "table" and name.startswith("products_fts"))
+
+def _url() -> str:
+    return config.get_main_option("sqlalchemy.url") or SQLALCHEMY_DATABASE_URL
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_name=include_name
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    connectable = create_db_engine(_url())
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            # SQLite can only alter tables by copying them
+            render_as_batch=connection.dialect.name == "sqlite"
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
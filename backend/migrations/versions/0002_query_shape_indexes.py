@@ -0,0 +1,49 @@
+"""query shape indexes
+
+Composite indexes matching the filters and sort keys of the installment,
+purchase and notification listings. Reports read daily_rollups, whose
+unique (day, category_id, status) constraint already indexes the day range.
+
+Databases built with create_all may already have these, hence if_not_exists.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 16:22:05.363305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_installments_due_date', 'installments', ['due_date', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_installments_purchase_id_due_date', 'installments', ['purchase_id', 'due_date'], unique=False, if_not_exists=True)
+
+    op.create_index('ix_notifications_created_at', 'notifications', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_notifications_user_id_created_at', 'notifications', ['user_id', 'created_at'], unique=False, if_not_exists=True)
+
+    op.create_index('ix_purchases_created_at', 'purchases', ['created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_purchases_status_created_at', 'purchases', ['status', 'created_at', 'id'], unique=False, if_not_exists=True)
+    op.create_index('ix_purchases_user_id_created_at', 'purchases', ['user_id', 'created_at', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_purchases_user_id_created_at', table_name='purchases', if_exists=True)
+    op.drop_index('ix_purchases_status_created_at', table_name='purchases', if_exists=True)
+    op.drop_index('ix_purchases_created_at', table_name='purchases', if_exists=True)
+
+    op.drop_index('ix_notifications_user_id_created_at', table_name='notifications', if_exists=True)
+    op.drop_index('ix_notifications_created_at', table_name='notifications', if_exists=True)
+
+    op.drop_index('ix_installments_purchase_id_due_date', table_name='installments', if_exists=True)
+    op.drop_index('ix_installments_due_date', table_name='installments', if_exists=True)
@@ -0,0 +1,143 @@
+"""rollup, outbox and notification job tables
+
+Tables, indexes and search objects added after the baseline. Databases built
+with create_all may already have some of them, hence if_not_exists. The
+rollup is backfilled from existing purchases with the same grouping as
+rebuild-rollups, in plain SQL so this revision does not depend on the models.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 17:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db.search import create_product_search
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Purchase counters by purchase status and installment counters by installment
+# status, per purchase day and category, merged into one row per key
+ROLLUP_BACKFILL = """
+INSERT INTO daily_rollups (
+    day, category_id, status,
+    purchase_count, paid_amount, due_amount, installment_count, installment_amount
+)
+SELECT day, category_id, status,
+    sum(purchase_count), sum(paid_amount), sum(due_amount), sum(installment_count), sum(installment_amount)
+FROM (
+    SELECT date(p.created_at) AS day, pr.category_id AS category_id, p.status AS status,
+        count(p.id) AS purchase_count,
+        coalesce(sum(p.paid_amount), 0) AS paid_amount,
+        coalesce(sum(p.due_amount), 0) AS due_amount,
+        0 AS installment_count,
+        0 AS installment_amount
+    FROM purchases p
+    JOIN products pr ON pr.id = p.product_id
+    GROUP BY date(p.created_at), pr.category_id, p.status
+    UNION ALL
+    SELECT date(p.created_at), pr.category_id, i.status,
+        0, 0, 0,
+        count(i.id),
+        coalesce(sum(i.amount), 0)
+    FROM installments i
+    JOIN purchases p ON p.id = i.purchase_id
+    JOIN products pr ON pr.id = p.product_id
+    GROUP BY date(p.created_at), pr.category_id, i.status
+) AS rollup_rows
+GROUP BY day, category_id, status
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('email_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('to_email', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('body', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index(op.f('ix_email_outbox_id'), 'email_outbox', ['id'], unique=False, if_not_exists=True)
+    op.create_index('ix_email_outbox_status_next_attempt_at', 'email_outbox', ['status', 'next_attempt_at'], unique=False, if_not_exists=True)
+
+    op.create_table('daily_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('purchase_count', sa.Integer(), nullable=False),
+    sa.Column('paid_amount', sa.Float(), nullable=False),
+    sa.Column('due_amount', sa.Float(), nullable=False),
+    sa.Column('installment_count', sa.Integer(), nullable=False),
+    sa.Column('installment_amount', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'category_id', 'status', name='unique_daily_rollup'),
+    if_not_exists=True
+    )
+    op.create_index(op.f('ix_daily_rollups_id'), 'daily_rollups', ['id'], unique=False, if_not_exists=True)
+
+    op.create_table('notification_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('audience', sa.String(), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.Column('notification_type', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index(op.f('ix_notification_jobs_id'), 'notification_jobs', ['id'], unique=False, if_not_exists=True)
+
+    op.create_index('ix_installments_status_due_date', 'installments', ['status', 'due_date'], unique=False, if_not_exists=True)
+
+    create_product_search(None, op.get_bind())
+
+    # Reports and the dashboard read only the rollup, so fill it for purchases made before it existed
+    op.execute("DELETE FROM daily_rollups")
+    op.execute(ROLLUP_BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ai")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS products_fts_au")
+        op.execute("DROP TABLE IF EXISTS products_fts")
+    elif bind.dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_products_search")
+
+    op.drop_index('ix_installments_status_due_date', table_name='installments', if_exists=True)
+
+    op.drop_index(op.f('ix_notification_jobs_id'), table_name='notification_jobs')
+    op.drop_table('notification_jobs')
+
+    op.drop_index(op.f('ix_daily_rollups_id'), table_name='daily_rollups')
+    op.drop_table('daily_rollups')
+
+    op.drop_index('ix_email_outbox_status_next_attempt_at', table_name='email_outbox')
+    op.drop_index(op.f('ix_email_outbox_id'), table_name='email_outbox')
+    op.drop_table('email_outbox')
@@ -35,10 +35,11 @@
         userIdFilter || null
        );
        console.log("Received data:", data); // Keep console log for debugging if needed
-       // API returns a direct array of purchases for the current page
-       setPurchases(Array.isArray(data) ? data : []); 
-       // Remove setting total from response as it's not provided
-       // The DataTable will show total based on the current page's data length
+       setPurchases(data.items || []);
+       setPagination(prev => ({
+         ...prev,
+         total: data.total,
+       }));
      } catch (err) {
       console.error("Failed to fetch purchases:", err);
       setError(err.message || 'Failed to fetch purchases.');
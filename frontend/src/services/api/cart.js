@@ -38,4 +38,15 @@ export const clearCart = () => {
   return fetchWithAuth('/api/v1/cart/', {
     method: 'DELETE',
   });
-};
\ No newline at end of file
+};
+
+// Convert the whole cart into purchases
+export const checkoutCart = (numberOfInstallments, daysBetweenInstallments) => {
+  return fetchWithAuth('/api/v1/cart/checkout', {
+    method: 'POST',
+    body: JSON.stringify({
+      number_of_installments: numberOfInstallments,
+      days_between_installments: daysBetweenInstallments
+    }),
+  });
+};